@@ -1,136 +1,189 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, PositiveInt
-from core.database import get_conn
+from core.config import settings
+from core.database import get_db, get_db_readonly
+from core.logging import get_logger
 from typing import List, Dict, Any, Optional
-import json
+import orjson
+import pymysql
+import redis
 
+logger = get_logger(__name__)
 router = APIRouter()
 
+# 购物车列表缓存 TTL（秒）：MySQL 仍是事实来源，写操作后主动失效
+_CART_CACHE_TTL = 300
+
+
+def _get_redis_client():
+    """获取 Redis 客户端，如果未配置则返回 None（购物车降级为直查 MySQL）"""
+    try:
+        client = redis.Redis(
+            host=getattr(settings, 'REDIS_HOST', 'localhost'),
+            port=getattr(settings, 'REDIS_PORT', 6379),
+            db=getattr(settings, 'REDIS_DB', 0),
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning(f"Redis 连接失败（购物车将直查数据库）: {e}")
+        return None
+
+
+redis_client = _get_redis_client()
+
+
+def _cart_cache_key(user_id: int) -> str:
+    return f"cart:items:{user_id}"
+
+
+# 热点 SQL 提升为模块常量：每次调用执行完全相同的语句文本，
+# pymysql 不支持服务端 PREPARE，但语句一致可让 MySQL 语句摘要/计划缓存生效
+_SQL_CART_UPSERT = (
+    "INSERT INTO cart(user_id, product_id, sku_id, quantity, specifications) "
+    "SELECT %s, %s, ps.id, %s, %s FROM product_skus ps "
+    "WHERE ps.product_id = %s ORDER BY ps.id LIMIT 1 "
+    "ON DUPLICATE KEY UPDATE "
+    "quantity = quantity + VALUES(quantity), "
+    "specifications = VALUES(specifications)"
+)
+
+_SQL_CART_LIST = """
+    SELECT c.id, c.user_id, c.product_id, c.sku_id,
+        c.quantity, c.specifications, c.selected, c.added_at,
+        p.name                                   AS product_name,
+        CAST(s.price AS DOUBLE)                  AS unit_price,
+        CAST(c.quantity * s.price AS DOUBLE)     AS total_price
+    FROM cart c
+    JOIN products p  ON p.id  = c.product_id
+    JOIN product_skus s ON s.id = c.sku_id   -- 关键：用 sku_id 精准匹配
+    WHERE c.user_id = %s
+    ORDER BY c.added_at DESC
+"""
+
+
+def invalidate_cart_cache(user_id: int):
+    """购物车写操作后失效缓存，保证下次读取拿到最新数据
+
+    供本模块及其他写购物车表的模块（如订单结算清空购物车）调用。
+    """
+    if redis_client:
+        try:
+            redis_client.delete(_cart_cache_key(user_id))
+        except Exception as e:
+            logger.debug(f"购物车缓存失效失败: {e}")
+
 class CartManager:
     @staticmethod
     def add(
+        conn,
         user_id: int,
         product_id: int,
         quantity: int = 1,
         specifications: Optional[Dict[str, Any]] = None
     ) -> bool:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                # 1. 用户是否存在
-                cur.execute("SELECT 1 FROM users WHERE id = %s", (user_id,))
-                if not cur.fetchone():
-                    raise HTTPException(status_code=404, detail=f"users 表中不存在 id={user_id}")
-
-                # 2. 商品是否存在
-                cur.execute("SELECT 1 FROM products WHERE id = %s", (product_id,))
-                if not cur.fetchone():
-                    raise HTTPException(status_code=404, detail=f"products 表中不存在 id={product_id}")
-
-                # 3. 取一个 sku_id
-                cur.execute(
-                    "SELECT id FROM product_skus WHERE product_id = %s LIMIT 1",
-                    (product_id,)
+        # 规格转 JSON 字符串
+        spec_str = orjson.dumps(specifications).decode() if specifications else None
+
+        with conn.cursor() as cur:
+            # 一条 INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 完成
+            # SKU 解析 + 插入/累加，存在性校验交给外键约束与 SELECT 结果
+            try:
+                affected = cur.execute(
+                    _SQL_CART_UPSERT,
+                    (user_id, product_id, quantity, spec_str, product_id),
                 )
-                sku_row = cur.fetchone()
-                if not sku_row:
-                    raise HTTPException(status_code=404, detail=f"product_skus 里找不到 product_id={product_id} 的记录")
-                sku_id = sku_row["id"]
-
-                # 4. 规格转 JSON 字符串
-                spec_str = json.dumps(specifications, ensure_ascii=False) if specifications else None
+            except pymysql.err.IntegrityError:
+                # 外键失败：user_id 或 product_id 不存在
+                raise HTTPException(status_code=404,
+                                    detail=f"users/products 表中不存在 user_id={user_id} 或 product_id={product_id}")
+            if affected == 0:
+                raise HTTPException(status_code=404,
+                                    detail=f"product_skus 里找不到 product_id={product_id} 的记录")
+            conn.commit()
+            invalidate_cart_cache(user_id)
+            return True
 
-                # 5. 插入或更新（含规格）
-                cur.execute(
-                    "SELECT quantity FROM cart WHERE user_id = %s AND product_id = %s",
-                    (user_id, product_id),
-                )
-                row = cur.fetchone()
-                if row:
-                    cur.execute(
-                        "UPDATE cart SET quantity = quantity + %s, specifications = %s "
-                        "WHERE user_id = %s AND product_id = %s",
-                        (quantity, spec_str, user_id, product_id),
-                    )
-                else:
-                    cur.execute(
-                        "INSERT INTO cart(user_id, product_id, sku_id, quantity, specifications) "
-                        "VALUES (%s, %s, %s, %s, %s)",
-                        (user_id, product_id, sku_id, quantity, spec_str),
+    @staticmethod
+    def list_items(conn, user_id: int) -> List[Dict[str, Any]]:
+        # 先查 Redis 缓存，未命中再回源 MySQL
+        cache_key = _cart_cache_key(user_id)
+        if redis_client:
+            try:
+                cached = redis_client.get(cache_key)
+                if cached:
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.debug(f"购物车缓存读取失败，回退数据库: {e}")
+
+        with conn.cursor() as cur:
+            cur.execute(_SQL_CART_LIST, (user_id,))
+            rows = cur.fetchall()
+            # 价格已在 SQL 里 CAST 成 DOUBLE，驱动直接给 float，这里只剩 JSON 反序列化
+            for r in rows:
+                r["specifications"] = orjson.loads(r["specifications"]) if r["specifications"] else None
+
+            if redis_client:
+                try:
+                    redis_client.setex(
+                        cache_key, _CART_CACHE_TTL,
+                        orjson.dumps(rows, default=str)
                     )
-                conn.commit()
-                return True
+                except Exception as e:
+                    logger.debug(f"购物车缓存写入失败: {e}")
+            return rows
 
     @staticmethod
-    def list_items(user_id: int) -> List[Dict[str, Any]]:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                sql = """
-                    SELECT c.*,
-                        p.name                     AS product_name,
-                        s.price                    AS unit_price,
-                        (c.quantity * s.price)     AS total_price
-                    FROM cart c
-                    JOIN products p  ON p.id  = c.product_id
-                    JOIN product_skus s ON s.id = c.sku_id   -- 关键：用 sku_id 精准匹配
-                    WHERE c.user_id = %s
-                    ORDER BY c.added_at DESC
-                """
-                cur.execute(sql, (user_id,))
-                rows = cur.fetchall()
-                for r in rows:
-                    r["unit_price"] = float(r["unit_price"])
-                    r["total_price"] = float(r["total_price"])
-                    # 仅反序列化库里的 JSON
-                    r["specifications"] = json.loads(r["specifications"]) if r["specifications"] else None
-                return rows
+    def remove(conn, user_id: int, product_id: int) -> bool:
+        with conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM cart WHERE user_id = %s AND product_id = %s",
+                (user_id, product_id),
+            )
+            conn.commit()
+            invalidate_cart_cache(user_id)
+            return True
 
-    @staticmethod
-    def remove(user_id: int, product_id: int) -> bool:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "DELETE FROM cart WHERE user_id = %s AND product_id = %s",
-                    (user_id, product_id),
-                )
-                conn.commit()
-                return True
-            
     @staticmethod
     def decrease(
+        conn,
         user_id: int,
         product_id: int,
         quantity: int = 1,
         specifications: Optional[Dict[str, Any]] = None
     ) -> bool:
         # 1. 把规格转成 JSON 字符串（None -> 'null'）
-        spec_str = json.dumps(specifications, ensure_ascii=False) if specifications else 'null'
-
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                # 2. 同为 NULL 或者 JSON 相等
+        spec_str = orjson.dumps(specifications).decode() if specifications else 'null'
+
+        with conn.cursor() as cur:
+            # 2. 同为 NULL 或者 JSON 相等
+            cur.execute(
+                "SELECT id, quantity FROM cart "
+                "WHERE user_id = %s AND product_id = %s "
+                "AND (specifications IS NULL AND %s = 'null' "
+                "     OR JSON_CONTAINS(specifications, %s) AND JSON_CONTAINS(%s, specifications))",
+                (user_id, product_id, spec_str, spec_str, spec_str)
+            )
+            row = cur.fetchone()
+            if not row:
+                return False
+
+            new_qty = row["quantity"] - quantity
+            cart_id = row["id"]
+
+            if new_qty <= 0:
+                cur.execute("DELETE FROM cart WHERE id = %s", (cart_id,))
+            else:
                 cur.execute(
-                    "SELECT id, quantity FROM cart "
-                    "WHERE user_id = %s AND product_id = %s "
-                    "AND (specifications IS NULL AND %s = 'null' "
-                    "     OR JSON_CONTAINS(specifications, %s) AND JSON_CONTAINS(%s, specifications))",
-                    (user_id, product_id, spec_str, spec_str, spec_str)
+                    "UPDATE cart SET quantity = %s WHERE id = %s",
+                    (new_qty, cart_id)
                 )
-                row = cur.fetchone()
-                if not row:
-                    return False
-
-                new_qty = row["quantity"] - quantity
-                cart_id = row["id"]
-
-                if new_qty <= 0:
-                    cur.execute("DELETE FROM cart WHERE id = %s", (cart_id,))
-                else:
-                    cur.execute(
-                        "UPDATE cart SET quantity = %s WHERE id = %s",
-                        (new_qty, cart_id)
-                    )
-                conn.commit()
-                return True
+            conn.commit()
+            invalidate_cart_cache(user_id)
+            return True
 
 
 # ----------- 请求模型 -----------
@@ -149,26 +202,28 @@ class CartDecrease(BaseModel):
 
 # ----------- 路由 -----------
 @router.post("/add", summary="添加商品到购物车")
-def cart_add(body: CartAdd):
-    return {"ok": CartManager.add(body.user_id,
+def cart_add(body: CartAdd, conn=Depends(get_db)):
+    return {"ok": CartManager.add(conn,
+                                  body.user_id,
                                   body.product_id,
                                   body.quantity,
                                   body.specifications)}
 
 
 @router.get("/{user_id}", summary="获取购物车列表")
-def get_cart(user_id: int):
+def get_cart(user_id: int, conn=Depends(get_db_readonly)):
     # 去掉 spec_map_str 参数，只读库
-    return CartManager.list_items(user_id)
+    return CartManager.list_items(conn, user_id)
 
 
 @router.delete("/{user_id}/{product_id}", summary="从购物车移除商品")
-def cart_remove(user_id: int, product_id: int):
-    return {"ok": CartManager.remove(user_id, product_id)}
+def cart_remove(user_id: int, product_id: int, conn=Depends(get_db)):
+    return {"ok": CartManager.remove(conn, user_id, product_id)}
 
 @router.post("/decrease", summary="按规格扣减/移除购物车商品")
-def cart_decrease(body: CartDecrease):
+def cart_decrease(body: CartDecrease, conn=Depends(get_db)):
     ok = CartManager.decrease(
+        conn,
         body.user_id,
         body.product_id,
         body.quantity,
@@ -176,4 +231,4 @@ def cart_decrease(body: CartDecrease):
     )
     if not ok:
         raise HTTPException(status_code=404, detail="购物车中未找到该商品/规格")
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
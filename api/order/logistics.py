@@ -1,14 +1,52 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-import requests
+import httpx
 import json
+import redis.asyncio as aioredis
+from core.config import settings
+from core.logging import get_logger
 
+logger = get_logger(__name__)
 router = APIRouter()
 
+# 复用同一个异步客户端，保持 keep-alive 连接，避免每次查询重建 TCP/TLS
+_http_client = httpx.AsyncClient(timeout=10)
+
+# 物流结果短 TTL 缓存：快递轨迹几分钟才更新一次，相同单号直接走 Redis
+_CACHE_TTL = 180  # 秒
+
+
+def _get_redis_client():
+    """获取异步 Redis 客户端，未配置或不可用时返回 None（降级为直连上游）"""
+    try:
+        return aioredis.Redis(
+            host=getattr(settings, 'REDIS_HOST', 'localhost'),
+            port=getattr(settings, 'REDIS_PORT', 6379),
+            db=getattr(settings, 'REDIS_DB', 0),
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+    except Exception as e:
+        logger.warning(f"Redis 客户端初始化失败（物流查询将直连上游）: {e}")
+        return None
+
+
+_redis_client = _get_redis_client()
+
 class LogisticsManager:
     @staticmethod
-    def query(tracking_number: str, company_code: str = "auto") -> Dict[str, Any]:
+    async def query(tracking_number: str, company_code: str = "auto") -> Dict[str, Any]:
+        cache_key = f"logi:{company_code}:{tracking_number}"
+        if _redis_client:
+            try:
+                cached = await _redis_client.get(cache_key)
+                if cached:
+                    return json.loads(cached)
+            except Exception as e:
+                logger.debug(f"物流缓存读取失败，回退上游查询: {e}")
+
         url = "https://poll.kuaidi100.com/poll/query.do"
         param = {
             "com": company_code,
@@ -26,19 +64,26 @@ class LogisticsManager:
             "param": json.dumps(param)
         }
         try:
-            resp = requests.post(url, data=payload, timeout=10)
+            resp = await _http_client.post(url, data=payload)
             resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException as e:
+            data = resp.json()
+        except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"物流查询失败: {str(e)}")
 
+        if _redis_client:
+            try:
+                await _redis_client.setex(cache_key, _CACHE_TTL, json.dumps(data, ensure_ascii=False))
+            except Exception as e:
+                logger.debug(f"物流缓存写入失败: {e}")
+        return data
+
 class LogisticsQuery(BaseModel):
     tracking_number: str
     company_code: Optional[str] = "auto"
 
 @router.post("/query", summary="查询物流信息")
-def logistics_query(body: LogisticsQuery) -> Dict[str, Any]:
-    data = LogisticsManager.query(body.tracking_number, body.company_code)
+async def logistics_query(body: LogisticsQuery) -> Dict[str, Any]:
+    data = await LogisticsManager.query(body.tracking_number, body.company_code)
     return {"ok": True, "data": data}
 
 # —— 与项目同构的注册函数 ——
@@ -8,7 +8,7 @@ from services.finance_service import split_order_funds
 from core.config import VALID_PAY_WAYS, POINTS_DISCOUNT_RATE
 from core.table_access import build_dynamic_select, get_table_structure, _quote_identifier
 from decimal import Decimal
-import uuid
+import secrets
 from datetime import datetime, timedelta
 from enum import Enum
 import json
@@ -28,6 +28,7 @@ import redis.exceptions
 
 # ==================== 新增：导入微信发货管理模块 ====================
 from .wechat_shipping import WechatShippingManager
+from .cart import invalidate_cart_cache
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -268,17 +269,41 @@ def start_wechat_status_sync_task():
     logger.info("[wx_sync] 微信订单状态同步守护线程已启动（每30分钟同步一次）")
 
 
+# 进程内缓存：orders 的 SELECT 字段串 和 product_skus 的库存字段元信息，
+# 表结构运行期不变，首次构建后直接复用字符串常量
+_orders_select_cache: Optional[str] = None
+_sku_stock_meta: Optional[tuple] = None
+
+
 class OrderManager:
     @staticmethod
     def _build_orders_select(cursor) -> str:
-        structure = get_table_structure(cursor, "orders")
-        select_parts = []
-        for field in structure['fields']:
-            if field in structure['asset_fields']:
-                select_parts.append(f"COALESCE({_quote_identifier(field)}, 0) AS {_quote_identifier(field)}")
-            else:
-                select_parts.append(_quote_identifier(field))
-        return ", ".join(select_parts)
+        global _orders_select_cache
+        if _orders_select_cache is None:
+            structure = get_table_structure(cursor, "orders")
+            select_parts = []
+            for field in structure['fields']:
+                if field in structure['asset_fields']:
+                    select_parts.append(f"COALESCE({_quote_identifier(field)}, 0) AS {_quote_identifier(field)}")
+                else:
+                    select_parts.append(_quote_identifier(field))
+            _orders_select_cache = ", ".join(select_parts)
+        return _orders_select_cache
+
+    @staticmethod
+    def _sku_stock_select(cursor) -> tuple:
+        """返回 (has_stock_field, stock_select)，首次调用后缓存"""
+        global _sku_stock_meta
+        if _sku_stock_meta is None:
+            structure = get_table_structure(cursor, "product_skus")
+            has_stock_field = 'stock' in structure['fields']
+            stock_select = (
+                f"COALESCE({_quote_identifier('stock')}, 0) AS {_quote_identifier('stock')}"
+                if has_stock_field and 'stock' in structure['asset_fields']
+                else _quote_identifier('stock')
+            ) if has_stock_field else "0 AS stock"
+            _sku_stock_meta = (has_stock_field, stock_select)
+        return _sku_stock_meta
 
     @staticmethod
     def create(
@@ -373,10 +398,30 @@ class OrderManager:
                             raise HTTPException(status_code=422, detail="立即购买时 buy_now_items 不能为空")
                         items = []
                         product_merchant_ids = set()  # 收集所有商品的商家ID
-                        
+
+                        # 批量查询商品信息，避免每个商品一次往返
+                        pids = tuple({it["product_id"] for it in buy_now_items})
+                        placeholders = ",".join(["%s"] * len(pids))
+                        cur.execute(
+                            f"SELECT id, is_member_product, user_id FROM products WHERE id IN ({placeholders})",
+                            pids
+                        )
+                        prod_map = {r["id"]: r for r in cur.fetchall()}
+
+                        # 批量补齐缺失的 sku_id（取每个商品的第一个 SKU）
+                        missing_sku_pids = tuple({it["product_id"] for it in buy_now_items if not it.get("sku_id")})
+                        sku_map = {}
+                        if missing_sku_pids:
+                            ph = ",".join(["%s"] * len(missing_sku_pids))
+                            cur.execute(
+                                f"SELECT product_id, MIN(id) AS id FROM product_skus "
+                                f"WHERE product_id IN ({ph}) GROUP BY product_id",
+                                missing_sku_pids
+                            )
+                            sku_map = {r["product_id"]: r["id"] for r in cur.fetchall()}
+
                         for it in buy_now_items:
-                            cur.execute("SELECT is_member_product, user_id FROM products WHERE id = %s", (it["product_id"],))
-                            prod = cur.fetchone()
+                            prod = prod_map.get(it["product_id"])
                             if not prod:
                                 raise HTTPException(status_code=404,
                                                     detail=f"products 表中不存在 id={it['product_id']}")
@@ -386,12 +431,8 @@ class OrderManager:
 
                             sku_id = it.get("sku_id")
                             if not sku_id:
-                                cur.execute("SELECT id FROM product_skus WHERE product_id = %s LIMIT 1",
-                                            (it['product_id'],))
-                                sku_row = cur.fetchone()
-                                if sku_row:
-                                    sku_id = sku_row.get('id')
-                                else:
+                                sku_id = sku_map.get(it["product_id"])
+                                if not sku_id:
                                     raise HTTPException(status_code=422,
                                                         detail=f"商品 {it['product_id']} 无可用 SKU，请提供 sku_id")
 
@@ -451,9 +492,17 @@ class OrderManager:
                     # 确保 merchant_id 是整数
                     merchant_id = int(merchant_id or 0)
 
+                    # 价格已是 Decimal（库里取出或入参时转换过一次），每项只算一次小计，
+                    # 避免反复的 Decimal(str(...)) 往返
+                    for i in items:
+                        i["line_total"] = i["price"] * i["quantity"]
+
                     # ---------- 2. 优惠券商品类型验证（新增） ----------
                     has_vip = any(i["is_vip"] for i in items)
 
+                    # 本次下单统一取一次当前时间，后续有效期/订单号/过期时间复用
+                    now = datetime.now()
+
                     if coupon_id:
                         # 查询优惠券详情并锁定
                         cur.execute("""
@@ -468,7 +517,7 @@ class OrderManager:
                             raise HTTPException(status_code=400, detail="优惠券不存在、已被使用或不属于当前用户")
 
                         # 检查有效期
-                        today = datetime.now().date()
+                        today = now.date()
                         if not (coupon['valid_from'] <= today <= coupon['valid_to']):
                             raise HTTPException(status_code=400, detail="优惠券不在有效期内")
 
@@ -481,7 +530,7 @@ class OrderManager:
 
                         # 检查优惠券金额是否超过订单金额
                         coupon_amount = Decimal(str(coupon['amount']))
-                        total_amount = sum(Decimal(str(i["quantity"])) * Decimal(str(i["price"])) for i in items)
+                        total_amount = sum((i["line_total"] for i in items), Decimal('0'))
                         if coupon_amount > total_amount:
                             raise HTTPException(status_code=400, detail="优惠券金额不能大于订单金额")
 
@@ -499,15 +548,11 @@ class OrderManager:
                         raise HTTPException(status_code=422, detail="必须上传收货地址或选择自提")
 
                     # ---------- 4. 订单主表 ----------
-                    total = sum(Decimal(str(i["quantity"])) * Decimal(str(i["price"])) for i in items)
+                    total = sum((i["line_total"] for i in items), Decimal('0'))
 
                     # ==================== 优化：更安全的订单号生成 ====================
-                    # 使用 16 位十六进制 UUID 代替原来的 6 位数字，极大降低碰撞概率
-                    order_number = (
-                            datetime.now().strftime("%Y%m%d%H%M%S") +
-                            str(user_id) +
-                            uuid.uuid4().hex[:16]  # 16位十六进制，比原来6位数字更安全
-                    )
+                    # 16 位十六进制随机后缀，token_hex(8) 与 uuid4 同熵但省去 UUID 格式化开销
+                    order_number = f"{now:%Y%m%d%H%M%S}{user_id}{secrets.token_hex(8)}"
 
                     init_status = "pending_pay"
 
@@ -521,53 +566,47 @@ class OrderManager:
                             pending_points, pending_coupon_id)
                         VALUES (%s, %s, %s, %s, %s, %s, %s,
                                 %s, %s, %s, %s, %s, %s, %s,
-                                'wechat', %s, %s, %s, %s, %s)
+                                'wechat', NOW() + INTERVAL 7 DAY, %s,
+                                NOW() + INTERVAL 12 HOUR, %s, %s)
                     """, (
                         user_id, merchant_id, order_number, total, total, init_status, has_vip,
                         consignee_name, consignee_phone,
                         province, city, district, shipping_address, delivery_way,
-                        datetime.now() + timedelta(days=7),
                         specifications,
-                        datetime.now() + timedelta(hours=12) if init_status == "pending_pay" else None,
                         points_to_use or Decimal('0'),
                         coupon_id
                     ))
                     oid = cur.lastrowid
 
-                    # ---------- 5. 库存校验 & 扣减 ----------
-                    structure = get_table_structure(cur, "product_skus")
-                    has_stock_field = 'stock' in structure['fields']
-                    stock_select = (
-                        f"COALESCE({_quote_identifier('stock')}, 0) AS {_quote_identifier('stock')}"
-                        if has_stock_field and 'stock' in structure['asset_fields']
-                        else _quote_identifier('stock')
-                    ) if has_stock_field else "0 AS stock"
+                    # ---------- 5. 库存校验 & 扣减（单条原子 UPDATE，防并发超卖） ----------
+                    has_stock_field, stock_select = OrderManager._sku_stock_select(cur)
 
-                    for i in items:
-                        cur.execute(f"SELECT {stock_select} FROM {_quote_identifier('product_skus')} WHERE id=%s",
-                                    (i['sku_id'],))
-                        result = cur.fetchone()
-                        current_stock = result.get('stock', 0) if result else 0
-                        if current_stock < i["quantity"]:
-                            raise HTTPException(status_code=400, detail=f"SKU {i['sku_id']} 库存不足")
-
-                    # ---------- 6. 写订单明细 ----------
-                    for i in items:
-                        cur.execute("""
-                            INSERT INTO order_items(order_id, product_id, sku_id, quantity, unit_price, total_price)
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                        """, (
-                            oid, i["product_id"], i["sku_id"], i["quantity"],
-                            i["price"], Decimal(str(i["quantity"])) * Decimal(str(i["price"]))
-                        ))
-
-                    # ---------- 7. 扣库存 ----------
                     if has_stock_field:
+                        # 条件扣减：stock >= quantity 才生效，失败即库存不足；
+                        # 异常时整个事务回滚，已扣减的行自动恢复
                         for i in items:
-                            cur.execute("UPDATE product_skus SET stock = stock - %s WHERE id = %s",
-                                        (i["quantity"], i['sku_id']))
+                            affected = cur.execute(
+                                "UPDATE product_skus SET stock = stock - %s WHERE id = %s AND stock >= %s",
+                                (i["quantity"], i["sku_id"], i["quantity"])
+                            )
+                            if affected == 0:
+                                raise HTTPException(status_code=400, detail=f"SKU {i['sku_id']} 库存不足")
+                    else:
+                        # 表无 stock 字段时维持原判定：视为零库存
+                        raise HTTPException(status_code=400, detail=f"SKU {items[0]['sku_id']} 库存不足")
+
+                    # ---------- 6. 写订单明细（单条多行 INSERT，一次往返） ----------
+                    item_rows = [
+                        (oid, i["product_id"], i["sku_id"], i["quantity"],
+                         i["price"], i["line_total"])
+                        for i in items
+                    ]
+                    cur.executemany("""
+                        INSERT INTO order_items(order_id, product_id, sku_id, quantity, unit_price, total_price)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                    """, item_rows)
 
-                    # ---------- 8. 清空购物车（仅购物车结算场景） ----------
+                    # ---------- 7. 清空购物车（仅购物车结算场景） ----------
                     if not buy_now:
                         cur.execute("DELETE FROM cart WHERE user_id = %s AND selected = 1", (user_id,))
 
@@ -577,6 +616,12 @@ class OrderManager:
                         redis_client.setex(used_key, 86400, order_number)  # 24小时过期
 
                     conn.commit()
+
+                    # 购物车结算删除了 cart 行，须同步失效 Redis 购物车缓存，
+                    # 否则 5 分钟 TTL 内购物车列表仍会返回已购商品
+                    if not buy_now:
+                        invalidate_cart_cache(user_id)
+
                     logger.info(f"订单创建成功: {order_number}, 用户: {user_id}, 商家: {merchant_id}")
                     return order_number
 
@@ -603,19 +648,25 @@ class OrderManager:
                 cur.execute(sql, tuple(params))
                 orders = cur.fetchall()
 
-                for o in orders:
+                # 一次查询取回每个订单的首件商品，替代每个订单一次往返（N+1）
+                first_map = {}
+                if orders:
+                    oids = tuple(o["id"] for o in orders)
+                    placeholders = ",".join(["%s"] * len(oids))
                     cur.execute(
-                        """
+                        f"""
                         SELECT oi.*, p.name
                         FROM order_items oi
                         JOIN products p ON oi.product_id = p.id
-                        WHERE oi.order_id = %s
-                        LIMIT 1
+                        WHERE oi.order_id IN ({placeholders})
+                          AND oi.id = (SELECT MIN(id) FROM order_items WHERE order_id = oi.order_id)
                         """,
-                        (o["id"],)
+                        oids
                     )
-                    first_item = cur.fetchone()
-                    o["first_product"] = first_item
+                    first_map = {r["order_id"]: r for r in cur.fetchall()}
+
+                for o in orders:
+                    o["first_product"] = first_map.get(o["id"])
                     o["specifications"] = o.get("refund_reason")
 
                 return orders
@@ -809,8 +860,8 @@ class OrderManager:
         """统一的订单状态更新，支持外部连接复用。"""
 
         def _apply_update(cur) -> bool:
-            cur.execute("SHOW COLUMNS FROM orders")
-            cols = {row.get("Field") for row in cur.fetchall()}
+            # 走 get_table_structure 的进程内缓存，避免每次更新都 SHOW COLUMNS
+            cols = set(get_table_structure(cur, "orders")['fields'])
 
             updates = ["status=%s", "updated_at=NOW()"]
             params: List[Any] = [new_status]
@@ -1418,38 +1469,36 @@ def auto_receive_task(db_cfg: dict = None):
 
     def run():
         while True:
+            # 默认兜底一小时；查到下一笔到期时间后睡到该时刻（5s~1h 夹逼），
+            # 既不空转轮询，也不会让到期订单干等到整点
+            sleep_secs = 3600
             try:
                 from core.database import get_conn
                 with get_conn() as conn:
                     with conn.cursor() as cur:
                         now = datetime.now()
-                        cur.execute(
-                            "SELECT id, order_number, total_amount FROM orders "
+                        # 集合式更新：到期订单一条 UPDATE 全部完成、一次提交，
+                        # 代替逐行 UPDATE + 逐行 commit 的 N 次往返。
+                        # （积分已在支付时发放，这里无需再逐单结算）
+                        affected = cur.execute(
+                            "UPDATE orders SET status='completed' "
                             "WHERE status='pending_recv' AND auto_recv_time<=%s",
                             (now,)
                         )
-                        for row in cur.fetchall():
-                            order_id = row["id"]
-                            order_number = row["order_number"]
-
-                            # 更新订单状态为已完成
-                            cur.execute(
-                                "UPDATE orders SET status='completed' WHERE id=%s",
-                                (order_id,)
-                            )
-
-                            # ✅ **移除**：积分已在支付时发放，自动收货不再发放
-                            # try:
-                            #     fs = FinanceService()
-                            #     fs.grant_points_on_receive(order_number, external_conn=conn)
-                            # except Exception as e:
-                            #     logger.error(f"[auto_receive] 订单{order_number}积分发放失败: {e}", exc_info=True)
+                        conn.commit()
+                        if affected:
+                            logger.info(f"[auto_receive] 已自动完成 {affected} 笔订单")
 
-                            conn.commit()
-                            logger.debug(f"[auto_receive] 订单 {order_number} 已自动完成。")
+                        cur.execute(
+                            "SELECT TIMESTAMPDIFF(SECOND, NOW(), MIN(auto_recv_time)) AS secs "
+                            "FROM orders WHERE status='pending_recv'"
+                        )
+                        row = cur.fetchone()
+                        if row and row.get('secs') is not None:
+                            sleep_secs = max(5, min(3600, row['secs']))
             except Exception as e:
                 logger.error(f"[auto_receive] 异常: {e}")
-            time.sleep(3600)  # 每小时检查一次
+            time.sleep(sleep_secs)
 
     t = threading.Thread(target=run, daemon=True)
     t.start()
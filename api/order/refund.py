@@ -8,6 +8,27 @@ from typing import Dict, Any
 
 router = APIRouter()
 
+# 热点 SQL 提升为模块常量：每次调用执行完全相同的语句文本，
+# pymysql 不支持服务端 PREPARE，但语句一致可让 MySQL 语句摘要/计划缓存生效
+_SQL_REFUND_INSERT = (
+    "INSERT INTO refunds(order_number,refund_type,reason,status) "
+    "VALUES(%s,%s,%s,'applied')"
+)
+
+_SQL_REFUND_TYPE = "SELECT refund_type FROM refunds WHERE order_number=%s"
+
+_SQL_REFUND_AUDIT = """
+    UPDATE refunds r
+    LEFT JOIN orders o ON o.order_number = r.order_number
+    SET r.status=%s,
+        r.reject_reason=%s,
+        r.merchant_address=%s,
+        o.refund_status=%s,
+        o.status=IF(%s, 'refund', 'completed')
+    WHERE r.order_number=%s
+"""
+
+
 class RefundManager:
     @staticmethod
     def apply(order_number: str, refund_type: str, reason_code: str) -> bool:
@@ -22,8 +43,7 @@ class RefundManager:
                 cur.execute(select_sql, (order_number,))
                 if cur.fetchone():
                     return False
-                cur.execute("""INSERT INTO refunds(order_number,refund_type,reason,status)
-                               VALUES(%s,%s,%s,'applied')""", (order_number, refund_type, reason_code))
+                cur.execute(_SQL_REFUND_INSERT, (order_number, refund_type, reason_code))
                 conn.commit()
                 return True
 
@@ -38,10 +58,7 @@ class RefundManager:
             with conn.cursor() as cur:
 
                 # 1️⃣ 查询退款类型
-                cur.execute(
-                    "SELECT refund_type FROM refunds WHERE order_number=%s",
-                    (order_number,)
-                )
+                cur.execute(_SQL_REFUND_TYPE, (order_number,))
                 row = cur.fetchone()
                 if not row:
                     return False
@@ -58,45 +75,28 @@ class RefundManager:
 
                 new_status = "refund_success" if approve else "rejected"
 
-                # 3️⃣ 更新 refunds
+                # 3️⃣ 多表 UPDATE 一次回写 refunds 与 orders：
+                # 原先 2-3 条 UPDATE 各一次往返，合并后只剩一次；
+                # LEFT JOIN 保证订单行缺失时退款单仍可更新（与原行为一致）
                 cur.execute(
-                    """
-                    UPDATE refunds
-                    SET status=%s,
-                        reject_reason=%s,
-                        merchant_address=%s
-                    WHERE order_number=%s
-                    """,
-                    (new_status, reject_reason, merchant_address, order_number)
+                    _SQL_REFUND_AUDIT,
+                    (new_status, reject_reason, merchant_address,
+                     new_status, approve, order_number)
                 )
 
                 if cur.rowcount == 0:
                     return False
 
-                # 4️⃣ 回写订单退款状态
-                cur.execute(
-                    "UPDATE orders SET refund_status=%s WHERE order_number=%s",
-                    (new_status, order_number)
-                )
-
                 if approve:
-                    cur.execute(
-                        "UPDATE orders SET status='refund' WHERE order_number=%s",
-                        (order_number,)
-                    )
                     reverse_split_on_refund(order_number)
-                else:
-                    cur.execute(
-                        "UPDATE orders SET status='completed' WHERE order_number=%s",
-                        (order_number,)
-                    )
 
                 conn.commit()
                 return True
 
     @staticmethod
     def progress(order_number: str) -> Optional[Dict[str, Any]]:
-        with get_conn() as conn:
+        # 纯读：autocommit 跳过隐式 BEGIN 和归还时的 ROLLBACK 往返
+        with get_conn(autocommit=True) as conn:
             with conn.cursor() as cur:
                 select_sql = build_dynamic_select(
                     cur,
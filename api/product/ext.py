@@ -12,7 +12,8 @@ router = APIRouter(tags=["商品管理"], responses={404: {"description": "未
     description="查询指定商品的会员价、购买规则及权益说明"
 )
 def get_product_rules(id: int):
-    with get_conn() as conn:
+    # 纯读：autocommit 跳过隐式 BEGIN 和归还时的 ROLLBACK 往返
+    with get_conn(autocommit=True) as conn:
         with conn.cursor() as cur:
             select_sql = build_dynamic_select(
                 cur,
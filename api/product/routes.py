@@ -1,4 +1,5 @@
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
@@ -28,7 +29,9 @@ def register_routes(app):
     app.include_router(product_ext_router, prefix="/api", tags=["商品管理"])
 
 
+@lru_cache(maxsize=8192)
 def to_pinyin(text: str) -> str:
+    """名称转大写拼音（纯函数，缓存重复名称的转换结果）"""
     return " ".join(lazy_pinyin(text, style=Style.NORMAL)).upper()
 
 
@@ -1,5 +1,5 @@
 # api/wechat_pay/routes.py
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, Response, HTTPException
 from core.wx_pay_client import WeChatPayClient
 from core.config import ENVIRONMENT, WECHAT_PAY_API_V3_KEY
 from core.response import success_response
@@ -8,10 +8,10 @@ from services.finance_service import FinanceService
 from decimal import Decimal
 from services.wechat_applyment_service import WechatApplymentService
 from datetime import datetime
-import json
+import orjson
 import logging
 import base64
-import xml.etree.ElementTree as ET  # 用于生成XML响应
+from lxml import etree
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 router = APIRouter(prefix="/wechat-pay", tags=["微信支付"])
@@ -148,7 +148,7 @@ async def create_jsapi_order(request: Request):
                         body = str(e.response)
                     logger.error(f"微信下单返回 HTTP 错误: status={getattr(e.response,'status_code', '')} body={body}")
                     try:
-                        data = json.loads(body)
+                        data = orjson.loads(body)
                         code = data.get('code')
                         message = data.get('message') or data.get('msg') or ''
                     except Exception:
@@ -198,11 +198,13 @@ async def wechat_pay_notify(request: Request):
     try:
         body = await request.body()
         # 调试：记录收到的原始请求体及长度（repr 格式，便于发现隐藏字符）
-        try:
-            logger.debug(f"收到原始请求体 ({len(body)} bytes): {body!r}")
-            logger.debug(f"请求头 Content-Type: {headers.get('content-type') if 'headers' in locals() else request.headers.get('content-type')}")
-        except Exception:
-            logger.debug("无法记录原始请求体（调试日志）")
+        # 先判断级别再格式化，避免 debug 关闭时也对大请求体做 repr
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                logger.debug("收到原始请求体 (%d bytes): %r", len(body), body)
+                logger.debug("请求头 Content-Type: %s", request.headers.get("content-type"))
+            except Exception:
+                logger.debug("无法记录原始请求体（调试日志）")
 
         # 检查请求体是否为空（防止JSONDecodeError）
         if not body or len(body.strip()) == 0:
@@ -253,20 +255,18 @@ async def wechat_pay_notify(request: Request):
         # 解析回调数据（真实微信通知是JSON，部分测试可能使用XML包装）
         content_type = headers.get("content-type", "")
         if "xml" in content_type:
-            import xmltodict  # 需要安装: pip install xmltodict
-
-            data_dict = xmltodict.parse(body)
-            data = data_dict.get("xml", {})
+            root = etree.fromstring(body)
+            data = {el.tag: _xml_node_to_obj(el) for el in root}
             if "resource" in data:
                 resource = data["resource"]
                 if isinstance(resource, str):
-                    data = json.loads(resource)
+                    data = orjson.loads(resource)
                 else:
                     data = {"resource": resource}
             else:
                 data = {"resource": data}
         else:
-            data = json.loads(body)
+            data = orjson.loads(body)
 
         # 解密回调数据
         resource = data.get("resource", {})
@@ -326,7 +326,7 @@ async def wechat_pay_notify(request: Request):
                 cipher_bytes = base64.b64decode(cipher_b64)
                 aesgcm = AESGCM(key_bytes)
                 plaintext = aesgcm.decrypt(nonce_bytes, cipher_bytes, ad_bytes)
-                decrypted_data = json.loads(plaintext.decode("utf-8"))
+                decrypted_data = orjson.loads(plaintext)
             except Exception as e:
                 logger.error(
                     "回调解密异常(官方示例逻辑): %s; key_len=%s; nonce_len=%s; ad_len=%s; ct_len=%s",
@@ -365,7 +365,7 @@ async def wechat_pay_notify(request: Request):
             logger.warning(f"未知的事件类型: {event_type}; payload={decrypted_data}")
             return _xml_response("FAIL", f"Unknown event_type: {event_type}")
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"JSON解析失败: {str(e)}")
         return _xml_response("FAIL", "Invalid JSON format")
     except Exception as e:
@@ -373,7 +373,20 @@ async def wechat_pay_notify(request: Request):
         return _xml_response("FAIL", str(e))
 
 
-def _xml_response(code: str, message: str) -> str:
+def _xml_node_to_obj(node):
+    """递归把 lxml 节点转成 dict/文本（叶子节点取 text）"""
+    children = list(node)
+    if not children:
+        return node.text
+    return {c.tag: _xml_node_to_obj(c) for c in children}
+
+
+# 成功应答是绝对热路径，预编码为常量字节，省掉每次格式化 + JSON 编码
+_SUCCESS_XML = (b"<xml>\n<return_code><![CDATA[SUCCESS]]></return_code>\n"
+                b"<return_msg><![CDATA[OK]]></return_msg>\n</xml>")
+
+
+def _xml_response(code: str, message: str) -> Response:
     """
     生成微信支付回调要求的XML格式响应
     微信要求返回格式：
@@ -382,10 +395,11 @@ def _xml_response(code: str, message: str) -> str:
         <return_msg><![CDATA[OK/错误信息]]></return_msg>
     </xml>
     """
-    return f"""<xml>
-<return_code><![CDATA[{code}]]></return_code>
-<return_msg><![CDATA[{message}]]></return_msg>
-</xml>"""
+    if code == "SUCCESS" and message == "OK":
+        return Response(content=_SUCCESS_XML, media_type="application/xml")
+    body = (f"<xml>\n<return_code><![CDATA[{code}]]></return_code>\n"
+            f"<return_msg><![CDATA[{message}]]></return_msg>\n</xml>")
+    return Response(content=body, media_type="application/xml")
 
 
 async def handle_applyment_state_change(data: dict):
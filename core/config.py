@@ -30,6 +30,7 @@ class Settings(BaseSettings):
 
     # 应用级配置
     UVICORN_PORT: int = 8000
+    UVICORN_WORKERS: int = 4
     DRAFT_EXPIRE_DAYS: int = 7
     MAX_FILE_SIZE_MB: int = 10
     qrcode_expire_seconds: int = 300
@@ -91,6 +92,7 @@ ENABLE_UUID_AUTH: Final[int] = settings.ENABLE_UUID_AUTH
 
 # ==================== 应用配置 ====================
 UVICORN_PORT: int = settings.UVICORN_PORT
+UVICORN_WORKERS: int = settings.UVICORN_WORKERS
 DRAFT_EXPIRE_DAYS: int = settings.DRAFT_EXPIRE_DAYS
 MAX_FILE_SIZE_MB: int = settings.MAX_FILE_SIZE_MB
 
@@ -2,36 +2,33 @@
 统一的数据库连接管理模块
 使用 pymysql 作为统一的数据库连接方式
 """
+import functools
+import itertools
 import pymysql
+import queue
+import time
 from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional
 from core.config import get_db_config
 
-# 全局连接配置缓存
-_db_config = None
+# 连接池：复用已建立的连接，避免每次请求都做 TCP + 认证握手
+# LIFO（栈式）取用让热连接被反复复用：低峰期只有栈顶少数连接保持活跃，
+# 服务端缓存局部性更好，栈底的冷连接自然闲置、由 MySQL wait_timeout 回收
+_POOL_MAXSIZE = 10
+_pool: "queue.LifoQueue" = queue.LifoQueue(maxsize=_POOL_MAXSIZE)
 
 
+@functools.lru_cache(maxsize=1)
 def get_db_config_cached():
-    """获取缓存的数据库配置"""
-    global _db_config
-    if _db_config is None:
-        _db_config = get_db_config()
-    return _db_config
+    """获取缓存的数据库配置（lru_cache 保证并发首调时只解析一次）"""
+    return get_db_config()
 
 
-@contextmanager
-def get_conn():
-    """
-    获取数据库连接的上下文管理器（统一入口）
-    
-    使用示例:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT * FROM users WHERE id = %s", (user_id,))
-                result = cur.fetchone()
-    """
+def _create_conn():
+    """创建一个新的 pymysql 连接"""
     cfg = get_db_config_cached()
-    conn = pymysql.connect(
+    return pymysql.connect(
         host=cfg['host'],
         port=cfg['port'],
         user=cfg['user'],
@@ -41,29 +38,177 @@ def get_conn():
         cursorclass=pymysql.cursors.DictCursor,
         autocommit=False  # 统一使用事务管理
     )
+
+
+# 闲置不超过该秒数的连接取出时跳过 ping 校验，省掉热路径上的一次往返；
+# 阈值远小于 MySQL wait_timeout（默认 28800），过期风险可忽略
+_PING_IDLE_SECONDS = 60
+
+
+def _acquire_conn():
+    """从连接池取一个连接，池空时新建；仅对闲置较久的连接做 ping 校验"""
+    try:
+        conn, released_at = _pool.get_nowait()
+    except queue.Empty:
+        return _create_conn()
+    if time.monotonic() - released_at < _PING_IDLE_SECONDS:
+        return conn
     try:
+        conn.ping(reconnect=True)
+        return conn
+    except Exception:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        return _create_conn()
+
+
+def _release_conn(conn):
+    """归还连接到池中；回滚未提交事务保证连接干净，池满则关闭"""
+    try:
+        if not conn.get_autocommit():
+            conn.rollback()
+        _pool.put_nowait((conn, time.monotonic()))
+    except queue.Full:
+        conn.close()
+    except Exception:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def close_pool():
+    """关闭池中全部空闲连接（供 FastAPI shutdown 钩子调用）"""
+    while True:
+        try:
+            conn, _ = _pool.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@contextmanager
+def get_conn(autocommit: bool = False):
+    """
+    获取数据库连接的上下文管理器（统一入口）
+
+    autocommit=True 适用于纯 SELECT 场景：跳过隐式 BEGIN 和随后的
+    COMMIT 往返。写操作保持默认的事务模式。
+
+    使用示例:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+                result = cur.fetchone()
+    """
+    conn = _acquire_conn()
+    try:
+        # 池中连接可能带着上一次的 autocommit 状态，不一致时才发 SET
+        if conn.get_autocommit() != autocommit:
+            conn.autocommit(autocommit)
         yield conn
     except Exception:
         conn.rollback()
         raise
     finally:
-        conn.close()
+        _release_conn(conn)
+
+
+# 请求级连接作用域：db_scope 中间件在请求开始时放入一个可变 holder，
+# 同一请求内所有 get_cursor() 调用共享其中惰性创建的连接，请求结束统一提交。
+# 用 dict 作为 holder 是因为同步路由跑在线程池的上下文副本里，
+# ContextVar 重新 set 不会传回中间件，但对同一 dict 的原地修改可以。
+_request_scope: ContextVar[Optional[dict]] = ContextVar("_request_scope", default=None)
+
+
+async def db_scope(request, call_next):
+    """FastAPI HTTP 中间件：让同一请求内的 execute_* 辅助函数共享一个连接/事务
+
+    请求内首次调用 get_cursor() 时才从池里取连接；请求正常结束时统一
+    commit 一次，异常时回滚，最后归还连接池。请求内没有数据库操作时
+    没有任何额外开销。
+    """
+    token = _request_scope.set({"conn": None})
+    try:
+        response = await call_next(request)
+        conn = _request_scope.get()["conn"]
+        if conn is not None:
+            conn.commit()
+        return response
+    except Exception:
+        conn = _request_scope.get()["conn"]
+        if conn is not None:
+            conn.rollback()
+        raise
+    finally:
+        conn = _request_scope.get()["conn"]
+        if conn is not None:
+            _release_conn(conn)
+        _request_scope.reset(token)
 
 
 @contextmanager
-def get_cursor():
+def get_cursor(autocommit: bool = False):
     """
     获取数据库游标的上下文管理器（便捷方法）
-    
+
+    在 db_scope 中间件的请求作用域内时复用请求级连接，不在此处提交
+    （由中间件在请求结束时统一提交）；否则退化为独立连接 + 即时提交。
+    autocommit=True 表示纯读操作，独立路径下省去 COMMIT 往返。
+
     使用示例:
         with get_cursor() as cur:
             cur.execute("SELECT * FROM users WHERE id = %s", (user_id,))
             result = cur.fetchone()
     """
-    with get_conn() as conn:
+    scope = _request_scope.get()
+    if scope is not None:
+        if scope["conn"] is None:
+            conn = _acquire_conn()
+            # 池中连接可能带着上一次使用者留下的 autocommit=True（纯读路径），
+            # 请求作用域的契约是"请求结束统一 commit / 异常回滚"，必须关掉
+            if conn.get_autocommit():
+                conn.autocommit(False)
+            scope["conn"] = conn
+        with scope["conn"].cursor() as cur:
+            yield cur
+        return
+    with get_conn(autocommit=autocommit) as conn:
         with conn.cursor() as cur:
             yield cur
-            conn.commit()
+            if not autocommit:
+                conn.commit()
+
+
+def get_db():
+    """
+    FastAPI 依赖：为每个请求注入一个池化连接
+
+    使用示例:
+        @router.get("/items")
+        def list_items(conn=Depends(get_db)):
+            with conn.cursor() as cur:
+                ...
+
+    同一请求内的多次数据库操作共享这一个连接，请求结束自动归还连接池。
+    """
+    with get_conn() as conn:
+        yield conn
+
+
+def get_db_readonly():
+    """FastAPI 依赖：为纯读端点注入 autocommit 连接
+
+    跳过隐式 BEGIN 与归还连接时的 ROLLBACK 往返；只适用于
+    不做任何写操作的端点。
+    """
+    with get_conn(autocommit=True) as conn:
+        yield conn
 
 
 def execute_query(sql: str, params: Optional[tuple] = None) -> list:
@@ -77,11 +222,45 @@ def execute_query(sql: str, params: Optional[tuple] = None) -> list:
     Returns:
         查询结果列表（字典格式）
     """
-    with get_cursor() as cur:
+    with get_cursor(autocommit=True) as cur:
         cur.execute(sql, params)
         return cur.fetchall()
 
 
+def iter_query(sql: str, params: Optional[tuple] = None, arraysize: int = 1000):
+    """
+    流式执行查询，逐行产出结果（生成器）
+
+    使用 SSDictCursor 让服务端按需下发结果集：客户端内存占用从 O(N)
+    降到 O(arraysize)，且第一行在第一个数据包到达后即可消费，适合
+    导出/遍历大结果集的场景。
+
+    注意：底层连接在迭代结束（或生成器被关闭）前一直被占用，
+    不要在迭代过程中长时间阻塞。
+
+    Args:
+        sql: SQL 查询语句
+        params: 查询参数（元组或字典）
+        arraysize: 每次从服务端批量拉取的行数
+
+    Yields:
+        查询结果行（字典格式）
+    """
+    conn = _acquire_conn()
+    try:
+        if not conn.get_autocommit():
+            conn.autocommit(True)
+        with conn.cursor(pymysql.cursors.SSDictCursor) as cur:
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(arraysize)
+                if not rows:
+                    break
+                yield from rows
+    finally:
+        _release_conn(conn)
+
+
 def execute_one(sql: str, params: Optional[tuple] = None) -> Optional[dict]:
     """
     执行查询并返回单条结果
@@ -93,7 +272,7 @@ def execute_one(sql: str, params: Optional[tuple] = None) -> Optional[dict]:
     Returns:
         查询结果（字典格式），如果没有结果返回 None
     """
-    with get_cursor() as cur:
+    with get_cursor(autocommit=True) as cur:
         cur.execute(sql, params)
         return cur.fetchone()
 
@@ -132,22 +311,67 @@ def execute_insert(sql: str, params: Optional[tuple] = None) -> int:
             return cur.lastrowid
 
 
-def execute_transaction(operations: list) -> bool:
+def execute_prepared(sql: str, params_list: list) -> int:
+    """
+    在同一连接上重复执行一条热点 SQL（批量形式）
+
+    pymysql 不支持二进制协议的服务端预编译；文本形式的 PREPARE/EXECUTE
+    每组参数还要额外的 SET 往返，实际更慢。这里用工程上等价的做法：
+    固定一个池连接 + executemany 一次往返批量执行，并保持语句文本稳定，
+    让服务端的语句摘要/执行计划相关缓存得以复用。
+
+    Args:
+        sql: SQL 语句（%s 占位符形式，所有参数组共用）
+        params_list: 参数组列表，每个元素对应一次执行
+
+    Returns:
+        受影响的总行数
+    """
+    if not params_list:
+        return 0
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            affected = cur.executemany(sql, params_list)
+            conn.commit()
+            return affected or 0
+
+
+def execute_transaction(operations: list, batch_size: int = 10000) -> list:
     """
     执行事务操作（多个 SQL 操作）
-    
+
+    连续的相同 SQL 会合并为一次 executemany 调用（pymysql 会把简单的
+    INSERT ... VALUES (%s, ...) 改写成多行插入包），减少客户端与服务端
+    之间的往返次数。
+
+    失败时直接抛出底层异常（事务已回滚），由调用方决定如何处理；
+    不再吞掉异常返回 False，调用方也就无需再发一条 SELECT 验证结果。
+
     Args:
         operations: 操作列表，每个元素是 (sql, params) 元组
-    
+        batch_size: 单次 executemany 的最大参数组数，超过则分批执行
+
     Returns:
-        是否成功
+        受影响行数列表，逐条执行时与 operations 一一对应；
+        被合并为 executemany 的一批相同 SQL 贡献一个合计条目
     """
-    try:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                for sql, params in operations:
-                    cur.execute(sql, params)
-                conn.commit()
-                return True
-    except Exception:
-        return False
+    # 快速路径：空列表无需取连接；单条操作等价于一次 execute_update
+    if not operations:
+        return []
+    if len(operations) == 1:
+        sql, params = operations[0]
+        return [execute_update(sql, params)]
+
+    rowcounts = []
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            for sql, group in itertools.groupby(operations, key=lambda op: op[0]):
+                params_list = [params for _, params in group]
+                if len(params_list) == 1 or any(p is None for p in params_list):
+                    for params in params_list:
+                        rowcounts.append(cur.execute(sql, params))
+                else:
+                    for i in range(0, len(params_list), batch_size):
+                        rowcounts.append(cur.executemany(sql, params_list[i:i + batch_size]))
+        conn.commit()
+    return rowcounts
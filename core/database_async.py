@@ -0,0 +1,50 @@
+"""
+数据库异步辅助模块
+
+给 async 端点提供并行查询能力：每个查询经 asyncio.to_thread 桥接到
+同步的 pymysql 辅助函数，各自从连接池取独立连接执行，配合
+asyncio.gather 可以让一个请求内相互独立的查询网络等待相互重叠，
+总耗时接近 max(query_i) 而不是 sum(query_i)。
+
+没有引入 aiomysql：同步辅助函数与连接池已经存在，线程池桥接即可
+获得并行收益，且避免再维护一套异步驱动和第二个连接池。
+"""
+import asyncio
+from typing import Optional
+
+from core.database import execute_query, execute_one, _request_scope
+
+
+def _run_unscoped(fn, *args):
+    """在线程内脱离请求级共享连接作用域后执行 fn
+
+    asyncio.to_thread 在上下文副本里运行，这里的 set 只影响本线程；
+    并行的各查询因此各用各的池连接，而不是并发争用 db_scope 中间件
+    共享的那一个连接。
+    """
+    _request_scope.set(None)
+    return fn(*args)
+
+
+async def execute_query_async(sql: str, params: Optional[tuple] = None) -> list:
+    """execute_query 的异步包装，见模块说明"""
+    return await asyncio.to_thread(_run_unscoped, execute_query, sql, params)
+
+
+async def execute_one_async(sql: str, params: Optional[tuple] = None) -> Optional[dict]:
+    """execute_one 的异步包装，见模块说明"""
+    return await asyncio.to_thread(_run_unscoped, execute_one, sql, params)
+
+
+async def gather_queries(*calls) -> list:
+    """并行执行多组查询，返回与入参同序的结果列表
+
+    使用示例:
+        orders, items = await gather_queries(
+            ("SELECT * FROM orders WHERE user_id = %s", (uid,)),
+            ("SELECT * FROM order_items WHERE user_id = %s", (uid,)),
+        )
+    """
+    return await asyncio.gather(
+        *(execute_query_async(sql, params) for sql, params in calls)
+    )
@@ -3,13 +3,41 @@
 提供统一的数据库操作接口，支持命名参数和便捷的结果访问
 """
 from contextlib import contextmanager
+import functools
 import logging
+import re
 from typing import Optional, Any, Dict, List
 from core.database import get_conn
 import pymysql
 from typing import Iterable, Tuple
 
 
+_PARAM_RE = re.compile(r":([A-Za-z_]\w*)")
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_named_sql(sql: str, keys: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+    """把 `:name` 占位符改写成 `%s` 并返回参数名的文本出现顺序
+
+    同一条 SQL 反复执行时只需改写一次（lru_cache 命中后是一次字典查找）。
+    单次正则扫描完成全部替换，占位符名按最长匹配识别，避免了逐个
+    str.replace 时 `:id` 误替换进 `:id2` 前缀的问题；只替换 keys 中
+    出现的参数名，其余 `:token` 保持原样。
+    """
+    keyset = frozenset(keys)
+    names: List[str] = []
+
+    def repl(m):
+        name = m.group(1)
+        if name in keyset:
+            names.append(name)
+            return "%s"
+        return m.group(0)
+
+    result_sql = _PARAM_RE.sub(repl, sql)
+    return result_sql, tuple(names)
+
+
 class PyMySQLAdapter:
     """
     PyMySQL 数据库适配器
@@ -19,13 +47,19 @@ class PyMySQLAdapter:
     def __init__(self):
         self._conn = None
         self._cursor = None
-    
+        self._ctx = None
+
+    def _ensure_conn(self):
+        """按需从连接池取一个连接（保存上下文对象，close 时归还连接池）"""
+        if self._conn is None:
+            self._ctx = get_conn()
+            self._conn = self._ctx.__enter__()
+            self._cursor = self._conn.cursor()
+
     @contextmanager
     def begin(self):
         """开始事务（上下文管理器）"""
-        if self._conn is None:
-            self._conn = get_conn().__enter__()
-            self._cursor = self._conn.cursor()
+        self._ensure_conn()
         try:
             yield self
             self._conn.commit()
@@ -45,10 +79,8 @@ class PyMySQLAdapter:
         Returns:
             ResultProxy 对象，用于访问查询结果
         """
-        if self._conn is None:
-            self._conn = get_conn().__enter__()
-            self._cursor = self._conn.cursor()
-        
+        self._ensure_conn()
+
         # 简单校验 SQL，拒绝包含多语句或注释的输入
         self._validate_sql(sql)
 
@@ -68,8 +100,7 @@ class PyMySQLAdapter:
             try:
                 # 关闭已有资源并重建
                 self.close()
-                self._conn = get_conn().__enter__()
-                self._cursor = self._conn.cursor()
+                self._ensure_conn()
                 logger.debug("Retrying SQL after reconnect: %s | params: %s", sql, values)
                 self._cursor.execute(sql, values)
             except Exception as e2:
@@ -202,13 +233,9 @@ class PyMySQLAdapter:
     
     def _convert_sql_params(self, sql: str, params: Dict[str, Any]) -> tuple:
         """将命名参数格式 `:param` 转换为 PyMySQL 的 `%s` 格式，并返回转换后的 SQL 和参数元组"""
-        result_sql = sql
-        param_list = []
-        # 按顺序替换参数
-        for key, value in params.items():
-            result_sql = result_sql.replace(f":{key}", "%s", 1)  # 只替换第一个
-            param_list.append(value)
-        return result_sql, tuple(param_list)
+        # 缓存键用排序后的参数名，调用方字典顺序不同也能命中同一条目
+        result_sql, names = _compile_named_sql(sql, tuple(sorted(params)))
+        return result_sql, tuple(params[name] for name in names)
     
     def commit(self):
         """提交事务"""
@@ -221,14 +248,24 @@ class PyMySQLAdapter:
             self._conn.rollback()
     
     def close(self):
-        """关闭连接"""
+        """关闭游标并把连接归还连接池"""
         logger = logging.getLogger(__name__)
         if self._cursor:
             try:
                 self._cursor.close()
             except Exception as e:
                 logger.debug("ignoring cursor.close() error: %s", e)
-        if self._conn:
+        if self._ctx is not None:
+            try:
+                # 退出 get_conn 上下文：回滚残留事务并把连接放回池中
+                self._ctx.__exit__(None, None, None)
+            except Exception as e:
+                logger.debug("ignoring pool release error: %s", e)
+            finally:
+                self._ctx = None
+                self._conn = None
+                self._cursor = None
+        elif self._conn:
             try:
                 self._conn.close()
             except Exception as e:
@@ -269,19 +306,26 @@ class ResultProxy:
     def __init__(self, cursor: pymysql.cursors.DictCursor):
         self._cursor = cursor
         self._rows = None
-    
+        self._iter = None
+
     def fetchone(self):
-        """获取单行结果"""
-        if self._rows is None:
-            self._rows = self._cursor.fetchall()
-        if self._rows:
-            row = self._rows[0]
-            self._rows = self._rows[1:]
-            return RowProxy(row)
-        return None
-    
+        """获取单行结果（逐行推进一个迭代器，避免每次切片复制整个结果集）"""
+        if self._iter is None:
+            # DML（INSERT/UPDATE/DELETE）没有结果集，直接短路
+            if self._cursor.description is None:
+                return None
+            if self._rows is None:
+                self._rows = self._cursor.fetchall()
+            self._iter = iter(self._rows)
+        row = next(self._iter, None)
+        return RowProxy(row) if row is not None else None
+
     def fetchall(self):
-        """获取所有结果"""
+        """获取所有结果（若已用 fetchone 消费过，则返回剩余行）"""
+        if self._iter is not None:
+            return [RowProxy(row) for row in self._iter]
+        if self._cursor.description is None:
+            return []
         if self._rows is None:
             self._rows = self._cursor.fetchall()
         return [RowProxy(row) for row in self._rows]
@@ -297,26 +341,17 @@ class ResultProxy:
         return self._cursor.rowcount
 
 
-class RowProxy:
-    """数据库行数据代理类，支持属性访问和字典访问两种方式"""
-    
-    def __init__(self, row: Dict):
-        self._row = row
-    
+class RowProxy(dict):
+    """数据库行数据代理类，支持属性访问和字典访问两种方式
+
+    直接继承 dict：__getitem__/__contains__/get 走 C 层哈希查找，
+    去掉原先 _row 间接层在每次字段访问时的 Python 级开销。
+    """
+    __slots__ = ()
+
     def __getattr__(self, name: str):
         """支持属性访问，如 row.balance"""
-        if name in self._row:
-            return self._row[name]
-        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
-    
-    def __getitem__(self, key: str):
-        """支持字典访问，如 row['balance']"""
-        return self._row[key]
-    
-    def __contains__(self, key: str):
-        """支持 in 操作"""
-        return key in self._row
-    
-    def get(self, key: str, default=None):
-        """字典风格的 get 方法"""
-        return self._row.get(key, default)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from None
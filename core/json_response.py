@@ -1,5 +1,5 @@
 from fastapi.responses import JSONResponse
-import json
+import orjson
 from decimal import Decimal
 from fastapi.requests import Request as FastAPIRequest
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -7,10 +7,18 @@ from fastapi.exceptions import RequestValidationError
 from typing import Any
 
 
+def _default(o: Any):
+    """orjson 回调：Decimal 转 float，其余未知类型退化为字符串（与旧行为一致）"""
+    if isinstance(o, Decimal):
+        return float(o)
+    return str(o)
+
+
 class DecimalJSONResponse(JSONResponse):
-    """Custom JSONResponse that serializes Decimal to float."""
+    """Custom JSONResponse that serializes Decimal to float (orjson-backed)."""
     def render(self, content: any) -> bytes:
-        return json.dumps(content, ensure_ascii=False, default=lambda o: float(o) if isinstance(o, Decimal) else str(o)).encode("utf-8")
+        # orjson 直接返回 bytes；OPT_NON_STR_KEYS 兼容 int 等非字符串键
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
 
 
 async def custom_http_exception_handler(request: FastAPIRequest, exc: StarletteHTTPException):
@@ -2,13 +2,25 @@
 动态表访问工具模块
 提供动态获取表结构并构造 SQL 查询的功能
 """
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple, Any
 from decimal import Decimal
+import functools
 import re
+import threading
 
 
 # 缓存表结构信息，避免重复查询
+# 读取依赖 CPython dict.get 的原子性（无锁）；写入/清理由 _cache_lock 串行化，
+# 缓存条目内部使用不可变容器，调用方拿到的是只读快照
 _table_structure_cache: Dict[str, Dict[str, any]] = {}
+_cache_lock = threading.Lock()
+
+# 数值类型判定：一次正则搜索代替逐个子串扫描
+_NUMERIC_RE = re.compile(r"DECIMAL|NUMERIC|FLOAT|DOUBLE|INT")
+
+# 字段名里出现这些关键字时按资产字段处理（缺失字段默认 0 而不是 NULL）
+_ASSET_KW = frozenset({"points", "balance", "amount"})
 
 
 def get_table_structure(cursor, table_name: str, use_cache: bool = True) -> Dict[str, any]:
@@ -49,22 +61,44 @@ def get_table_structure(cursor, table_name: str, use_cache: bool = True) -> Dict
         field_types[field_name] = field_type
         
         # 判断是否为资产字段（数值类型）
-        if any(num_type in field_type for num_type in ['DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE', 'INT', 'BIGINT', 'TINYINT', 'SMALLINT', 'MEDIUMINT']):
+        if _NUMERIC_RE.search(field_type):
             asset_fields.append(field_name)
-    
-    result = {
-        'fields': fields,
-        'asset_fields': asset_fields,
-        'field_types': field_types
-    }
-    
-    # 缓存结果
+
+    result = _freeze_structure(fields, asset_fields, field_types)
+
+    # 缓存结果（写入加锁，读路径无锁）
     if use_cache:
-        _table_structure_cache[cache_key] = result
-    
+        with _cache_lock:
+            _table_structure_cache[cache_key] = result
+
     return result
 
 
+def _freeze_structure(fields: List[str], asset_fields: List[str],
+                      field_types: Dict[str, str]) -> Dict[str, any]:
+    """把表结构信息固化成只读快照（元组/冻结集合/只读映射）"""
+    asset_set = frozenset(asset_fields)
+    return {
+        'fields': tuple(fields),
+        'asset_fields': tuple(asset_fields),
+        'field_types': MappingProxyType(dict(field_types)),
+        # frozenset 版本供成员判断使用，O(1) 代替列表线性扫描
+        'fields_set': frozenset(fields),
+        'asset_fields_set': asset_set,
+        # 每个字段的 SELECT 渲染结果在元数据阶段决定一次，查询路径直接取用
+        'render_map': MappingProxyType(_build_render_map(fields, asset_set))
+    }
+
+
+def _build_render_map(fields: List[str], asset_set: frozenset) -> Dict[str, str]:
+    """在元数据阶段为每个字段预渲染 SELECT 片段（资产字段带 COALESCE 默认值）"""
+    return {
+        f: (f"COALESCE({_quote_identifier(f)}, 0) AS {_quote_identifier(f)}"
+            if f in asset_set else _quote_identifier(f))
+        for f in fields
+    }
+
+
 _IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
 
@@ -133,10 +167,36 @@ def build_select_sql(table_name: str, structure: Dict[str, any],
     Returns:
         构造的 SQL 语句
     """
-    fields = select_fields if select_fields else structure['fields']
-    asset_fields = structure['asset_fields']
-    existing_fields = structure['fields']  # 实际存在的字段列表
-    
+    # 转成可哈希参数后走 lru_cache：同一 (表, 字段, 子句) 组合只渲染一次
+    fields = tuple(select_fields) if select_fields else tuple(structure['fields'])
+    render_map = structure.get('render_map')
+    if render_map is None:
+        # 手工构造的 structure 没有预渲染表，补一份
+        render_map = _build_render_map(structure['fields'],
+                                       frozenset(structure['asset_fields']))
+    return _render_select_sql(
+        table_name,
+        fields,
+        tuple(sorted(render_map.items())),
+        where_clause,
+        order_by,
+        str(limit) if limit is not None else None,
+    )
+
+
+@functools.lru_cache(maxsize=2048)
+def _render_select_sql(table_name: str, fields: Tuple[str, ...],
+                       render_items: Tuple[Tuple[str, str], ...],
+                       where_clause: Optional[str],
+                       order_by: Optional[str],
+                       limit: Optional[str]) -> str:
+    """build_select_sql 的实际渲染逻辑（参数均为可哈希类型，结果被缓存）
+
+    每个存在字段的 SELECT 片段已在 get_table_structure 阶段渲染好，
+    这里只做字典取用和缺失字段的默认值处理，最后一次性拼接。
+    """
+    render_map = dict(render_items)
+
     # 构造 SELECT 字段列表，对资产字段设置默认值
     select_parts = []
     for field in fields:
@@ -144,42 +204,36 @@ def build_select_sql(table_name: str, structure: Dict[str, any],
         if isinstance(field, str) and field.isdigit():
             select_parts.append(field)
             continue
-        # 对字段名进行白名单校验与引用，防止注入
-        if field not in existing_fields:
-            # 字段不存在，使用默认值并引用别名
-            if field in asset_fields or any(num_type in field.lower() for num_type in ['points', 'balance', 'amount']):
+        rendered = render_map.get(field)
+        if rendered is not None:
+            select_parts.append(rendered)
+        else:
+            # 字段不存在，使用默认值并引用别名（字段名仍走白名单式引用防注入）
+            fl = field.lower()
+            if any(kw in fl for kw in _ASSET_KW):
                 select_parts.append(f"0 AS {_quote_identifier(field)}")
             else:
                 select_parts.append(f"NULL AS {_quote_identifier(field)}")
-        elif field in asset_fields:
-            # 资产字段：引用字段并使用 COALESCE
-            select_parts.append(f"COALESCE({_quote_identifier(field)}, 0) AS {_quote_identifier(field)}")
-        else:
-            # 非资产字段：直接引用字段名
-            select_parts.append(_quote_identifier(field))
-    
-    # 引用表名
-    sql = f"SELECT {build_select_list(select_parts)} FROM {_quote_identifier(table_name)}"
-    
+
     if where_clause:
         # where_clause 可能包含参数占位符，仍然允许使用占位符，但禁止分号等附加语句
         if ";" in where_clause or "--" in where_clause or "/*" in where_clause:
             raise ValueError("unsafe characters in where_clause")
-        sql += f" WHERE {where_clause}"
-    
     if order_by:
         # 简单校验 ORDER BY，避免附加非标识符字符
         if ";" in order_by or "--" in order_by or "/*" in order_by:
             raise ValueError("unsafe characters in order_by")
-        sql += f" ORDER BY {order_by}"
-    
     if limit:
         # 仅允许数字或数字,数字 的形式
         if not re.match(r"^\d+(,\s*\d+)?$", str(limit)):
             raise ValueError("unsafe limit clause")
-        sql += f" LIMIT {limit}"
-    
-    return sql
+
+    return (
+        f"SELECT {', '.join(select_parts)} FROM {_quote_identifier(table_name)}"
+        f"{f' WHERE {where_clause}' if where_clause else ''}"
+        f"{f' ORDER BY {order_by}' if order_by else ''}"
+        f"{f' LIMIT {limit}' if limit else ''}"
+    )
 
 
 def build_dynamic_select(cursor, table_name: str, 
@@ -205,6 +259,51 @@ def build_dynamic_select(cursor, table_name: str,
     return build_select_sql(table_name, structure, where_clause, order_by, limit, select_fields)
 
 
+def warm_table_cache(cursor, schema: str) -> int:
+    """
+    一次性预加载整个库的表结构到缓存
+
+    冷启动时逐表 SHOW COLUMNS 需要 N 次往返；这里用一条
+    information_schema 查询拉取全部列信息并按表拆分写入缓存，
+    之后 get_table_structure 只有在缓存未命中时才回退到 SHOW COLUMNS。
+
+    Args:
+        cursor: 数据库游标
+        schema: 数据库（schema）名
+
+    Returns:
+        预加载的表数量
+    """
+    cursor.execute(
+        "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE "
+        "FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = %s "
+        "ORDER BY TABLE_NAME, ORDINAL_POSITION",
+        (schema,)
+    )
+
+    tables: Dict[str, Dict[str, any]] = {}
+    for row in cursor.fetchall():
+        table = tables.setdefault(row['TABLE_NAME'], {
+            'fields': [],
+            'asset_fields': [],
+            'field_types': {}
+        })
+        field_name = row['COLUMN_NAME']
+        field_type = row['COLUMN_TYPE'].upper()
+        table['fields'].append(field_name)
+        table['field_types'][field_name] = field_type
+        if _NUMERIC_RE.search(field_type):
+            table['asset_fields'].append(field_name)
+
+    with _cache_lock:
+        for table_name, structure in tables.items():
+            _table_structure_cache[table_name] = _freeze_structure(
+                structure['fields'], structure['asset_fields'], structure['field_types'])
+
+    return len(tables)
+
+
 def clear_table_cache(table_name: Optional[str] = None):
     """
     清除表结构缓存
@@ -213,10 +312,13 @@ def clear_table_cache(table_name: Optional[str] = None):
         table_name: 表名，如果为 None 则清除所有缓存
     """
     global _table_structure_cache
-    if table_name:
-        _table_structure_cache.pop(table_name, None)
-    else:
-        _table_structure_cache.clear()
+    with _cache_lock:
+        if table_name:
+            _table_structure_cache.pop(table_name, None)
+        else:
+            _table_structure_cache.clear()
+    # 表结构变化后，基于旧结构渲染的 SELECT 语句也要一并失效
+    _render_select_sql.cache_clear()
 
 
 # ===== 新增缺失的函数 =====
@@ -0,0 +1,729 @@
+-- 项目建表 DDL（由 database_setup._load_table_ddl 解析）
+-- 每张表以 "-- @table <表名>" 分节，节序即建表顺序：
+-- 被引用表在前，外键随 CREATE TABLE 内联创建
+
+-- @table users
+CREATE TABLE IF NOT EXISTS users (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    mobile VARCHAR(30) UNIQUE,
+    password_hash CHAR(60),
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE,
+    member_level TINYINT NOT NULL DEFAULT 0,
+    points DECIMAL(12,4) NOT NULL DEFAULT 0.0000 COMMENT '联创星级专用点数(用于计算总获得点数)',
+    subsidy_points DECIMAL(12,4) NOT NULL DEFAULT 0.0000 COMMENT '周补贴专用点数(用于计算总获得点数)',
+    team_reward_points DECIMAL(12,4) NOT NULL DEFAULT 0.0000 COMMENT '团队奖励专用点数(用于计算总获得点数)',
+    referral_points DECIMAL(12,4) NOT NULL DEFAULT 0.0000 COMMENT '推荐奖励专用点数(用于计算总获得点数)',
+    true_total_points DECIMAL(12,4) NOT NULL DEFAULT 0.0000 COMMENT '联创星级、周补贴、团队奖励、推荐奖励点数真实总数，发放联创星级、周补贴、团队奖励、推荐奖励点数时会额外发放一份进入这里',
+    promotion_balance DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    member_points DECIMAL(12,4) NOT NULL DEFAULT 0.0000,
+    merchant_points DECIMAL(12,4) NOT NULL DEFAULT 0.0000,
+    merchant_balance DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    status TINYINT NOT NULL DEFAULT 1,
+    level_changed_at DATETIME NULL,
+    referral_id BIGINT UNSIGNED NULL COMMENT '推荐人id',
+    referral_code VARCHAR(6) NULL COMMENT '推荐码',
+    withdrawable_balance DECIMAL(14,2) NOT NULL DEFAULT 0.00 COMMENT '可提现余额',
+    avatar_path VARCHAR(255) NULL DEFAULT NULL COMMENT '头像路径',
+    avatar VARCHAR(255) NULL DEFAULT NULL COMMENT '头像',
+    is_merchant TINYINT NOT NULL DEFAULT 0 COMMENT '0=普通用户,1=商家,2=第三方/平台',
+    six_director INT NULL DEFAULT 0 COMMENT '直推六星人数，用于荣誉董事晋升判定',
+    six_team INT NULL DEFAULT 0 COMMENT '团队六星人数，用于荣誉董事晋升判定',
+    wechat_sub_mchid VARCHAR(32) NULL DEFAULT NULL COMMENT '微信特约商户号',
+    openid VARCHAR(128) NULL DEFAULT NULL COMMENT '微信小程序openid',
+    token VARCHAR(256) NULL COMMENT '认证token（支持UUID/JWT/微信Token）',
+    qr_path VARCHAR(255) DEFAULT NULL COMMENT '推荐码二维码路径',
+    wx_openid VARCHAR(100) UNIQUE DEFAULT NULL COMMENT '微信openid',
+    phone VARCHAR(20) DEFAULT NULL COMMENT '手机号',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_mobile (mobile),
+    INDEX idx_email (email),
+    INDEX idx_member_level (member_level),
+    INDEX idx_wechat_sub_mchid (wechat_sub_mchid),
+    UNIQUE KEY uk_referral_code (referral_code),
+    INDEX idx_token (token)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table products
+CREATE TABLE IF NOT EXISTS products (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    pinyin TEXT,
+    description TEXT,
+    category VARCHAR(100),
+    cover VARCHAR(500) NULL COMMENT '商品封面图',
+    main_image VARCHAR(500),
+    detail_images TEXT,
+    is_member_product TINYINT(1) NOT NULL DEFAULT 0,
+    status TINYINT NOT NULL DEFAULT 0,
+    user_id BIGINT UNSIGNED,
+    buy_rule TEXT,
+    freight DECIMAL(12,2) DEFAULT 0.00,
+    -- ✅ 新增字段：积分抵扣上限（支持小数，精确到4位）
+    max_points_discount DECIMAL(12,4) DEFAULT NULL COMMENT '积分抵扣上限',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_is_member_product (is_member_product),
+    INDEX idx_user_id (user_id),
+    INDEX idx_status (status),
+    INDEX idx_category (category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table orders
+CREATE TABLE IF NOT EXISTS orders (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    order_number VARCHAR(50) UNIQUE COMMENT '订单号（兼容订单系统）',
+    user_id BIGINT UNSIGNED NOT NULL,
+    merchant_id BIGINT UNSIGNED NOT NULL DEFAULT 0 COMMENT '商家ID（0=平台自营）',
+    offline_order_flag TINYINT(1) NOT NULL DEFAULT 0 COMMENT '是否线下收银订单：0线上/1线下',
+    applyment_id BIGINT UNSIGNED DEFAULT NULL COMMENT '关联微信进件单ID（线下订单必填）',
+    total_amount DECIMAL(12,2) NOT NULL,
+    original_amount DECIMAL(12,2) DEFAULT 0.00,
+    points_discount DECIMAL(12,4) NOT NULL DEFAULT 0.0000,
+    is_member_order TINYINT(1) NOT NULL DEFAULT 0,
+    is_vip_item TINYINT(1) DEFAULT 0 COMMENT '1=含会员商品（兼容订单系统）',
+    status VARCHAR(30) NOT NULL DEFAULT 'pending_pay',
+    -- 统一枚举，与 refunds.status 保持一致
+    refund_status ENUM('applied','seller_ok','refund_success','rejected','seller_rejected') DEFAULT NULL,
+    consignee_name VARCHAR(100),
+    consignee_phone VARCHAR(20),
+    province VARCHAR(20) DEFAULT '',
+    city VARCHAR(20) DEFAULT '',
+    district VARCHAR(20) DEFAULT '',
+    shipping_address TEXT,
+    pay_way ENUM('wechat') DEFAULT 'wechat',
+    refund_reason TEXT,
+    auto_recv_time DATETIME NULL COMMENT '7 天后自动收货',
+    tracking_number VARCHAR(64) NULL COMMENT '快递单号',
+    transaction_id VARCHAR(64) DEFAULT NULL COMMENT '微信/支付宝交易号',
+    pay_time DATETIME NULL COMMENT '支付成功时间',
+    paid_at DATETIME NULL COMMENT '支付时间（冗余，用于状态流转）',
+    shipped_at DATETIME NULL COMMENT '发货时间',
+    completed_at DATETIME NULL COMMENT '完成时间',
+    status_reason VARCHAR(255) NULL COMMENT '状态原因说明',
+    remark VARCHAR(255) NULL COMMENT '备注',
+    delivery_way VARCHAR(20) NOT NULL DEFAULT 'platform' COMMENT '配送方式：platform-平台配送/pickup-自提',
+    expire_at DATETIME NULL COMMENT '订单过期时间（未支付订单7天后自动过期）',
+    wechat_shipping_status TINYINT NOT NULL DEFAULT 0 COMMENT '微信发货状态：0未上传 1已上传 2上传失败 3已重新上传',
+    wechat_shipping_time DATETIME NULL COMMENT '微信发货信息上传时间',
+    wechat_shipping_msg VARCHAR(500) NULL COMMENT '微信发货接口返回错误信息',
+    wechat_last_sync_time DATETIME NULL COMMENT '最后一次同步微信状态时间',
+    wechat_shipping_retry_count TINYINT NOT NULL DEFAULT 0 COMMENT '微信发货重试次数，最多1次',
+    pending_points DECIMAL(12,4) DEFAULT NULL,           -- 确保有这行（或让自动添加机制处理）
+    pending_coupon_id BIGINT UNSIGNED DEFAULT NULL,      -- 确保有这行（或让自动添加机制处理）
+    coupon_discount DECIMAL(12,4) NOT NULL DEFAULT 0.0000, -- 确保有这行
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- idx_user_status_created 的最左前缀已覆盖 user_id 单列查询（含外键所需索引），
+    -- "某用户某状态的订单按时间排序"走索引即可完成过滤 + 排序
+    INDEX idx_user_status_created (user_id, status, created_at),
+    INDEX idx_order_number (order_number),
+    INDEX idx_trans (transaction_id),
+    INDEX idx_pay_time (pay_time),
+    INDEX idx_created_at (created_at),
+    -- 自动收货扫描 WHERE status='pending_recv' AND auto_recv_time<=NOW()
+    -- 走该复合索引的范围扫描；其最左前缀同时覆盖 status 单列查询
+    INDEX idx_status_autorecv (status, auto_recv_time),
+    INDEX idx_expire_at (expire_at),
+    INDEX idx_wechat_shipping_status (wechat_shipping_status),
+    CONSTRAINT orders_ibfk_1 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table wechat_shipping_logs
+CREATE TABLE IF NOT EXISTS wechat_shipping_logs (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    order_id BIGINT UNSIGNED NOT NULL COMMENT '关联订单ID',
+    order_number VARCHAR(50) NOT NULL COMMENT '商户订单号',
+    transaction_id VARCHAR(64) NULL COMMENT '微信支付单号',
+    action_type ENUM('upload', 'retry', 'query', 'sync') NOT NULL DEFAULT 'upload' COMMENT '操作类型：upload首次上传/retry重新上传/query查询状态/sync状态同步',
+    remark VARCHAR(500) NULL COMMENT '附加说明（例如同步、确认收货等描述）',
+    logistics_type TINYINT NULL COMMENT '物流类型：1快递/2同城/3虚拟/4自提',
+    express_company VARCHAR(50) NULL COMMENT '物流公司编码',
+    tracking_no VARCHAR(128) NULL COMMENT '运单号',
+    request_data JSON NULL COMMENT '请求微信的JSON数据',
+    response_data JSON NULL COMMENT '微信返回的JSON数据',
+    errcode INT NULL COMMENT '微信返回的错误码',
+    errmsg VARCHAR(500) NULL COMMENT '微信返回的错误信息',
+    is_success TINYINT(1) NOT NULL DEFAULT 0 COMMENT '是否成功：0失败 1成功',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_order_id (order_id),
+    INDEX idx_order_number (order_number),
+    INDEX idx_transaction_id (transaction_id),
+    INDEX idx_action_type (action_type),
+    INDEX idx_is_success (is_success),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table offline_order
+CREATE TABLE IF NOT EXISTS offline_order (
+    id                  BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    order_no            VARCHAR(50) UNIQUE NOT NULL COMMENT '线下订单号',
+    merchant_id         BIGINT UNSIGNED NOT NULL COMMENT '商家ID',
+    user_id             BIGINT UNSIGNED NULL COMMENT '付款用户ID（可空）',
+    store_name          VARCHAR(100) NOT NULL COMMENT '门店名称',
+    amount              INT NOT NULL COMMENT '订单金额（单位：分）',
+    coupon_id           INT NULL COMMENT '使用的优惠券ID',           
+    coupon_discount     INT DEFAULT 0 COMMENT '优惠券抵扣金额（分）', 
+    paid_amount         INT DEFAULT 0 COMMENT '实付金额（分，优惠后）',
+    product_name        VARCHAR(255) DEFAULT '' COMMENT '商品名称',
+    remark              TEXT COMMENT '备注',
+    status              TINYINT NOT NULL DEFAULT 1 COMMENT '1待支付 2已支付 4已退款',
+    qrcode_url          TEXT DEFAULT NULL COMMENT '收款码',
+    qrcode_expire       DATETIME DEFAULT NULL COMMENT '码过期时间',
+    refresh_count       TINYINT NOT NULL DEFAULT 0 COMMENT '已刷新次数',
+    related_order_no    VARCHAR(50) DEFAULT NULL COMMENT '关联主订单号',
+    pay_time            DATETIME NULL COMMENT '微信/支付宝支付成功时间',
+    transaction_id      VARCHAR(64) DEFAULT NULL COMMENT '微信/支付宝交易号',
+    refund_id           VARCHAR(64) DEFAULT NULL COMMENT '微信/支付宝退款单号',
+    refund_time         DATETIME NULL COMMENT '退款完成时间',
+    openid              VARCHAR(64) DEFAULT NULL COMMENT '付款人 openid（可选）',
+    created_at          DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at          DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_merchant  (merchant_id),
+    INDEX idx_status    (status),
+    INDEX idx_expire    (qrcode_expire),
+    INDEX idx_trans     (transaction_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table order_items
+CREATE TABLE IF NOT EXISTS order_items (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    order_id BIGINT UNSIGNED NOT NULL,
+    product_id BIGINT UNSIGNED NOT NULL,
+    sku_id BIGINT UNSIGNED NULL,
+    quantity INT NOT NULL DEFAULT 1,
+    unit_price DECIMAL(12,2) NOT NULL,
+    total_price DECIMAL(12,2) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_order (order_id),
+    INDEX idx_product (product_id),
+    CONSTRAINT order_items_ibfk_1 FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
+    CONSTRAINT order_items_ibfk_2 FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table finance_accounts
+CREATE TABLE IF NOT EXISTS finance_accounts (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    account_name VARCHAR(100) NOT NULL,
+    account_type VARCHAR(50) UNIQUE NOT NULL,
+    balance DECIMAL(14,4) NOT NULL DEFAULT 0.0000,
+    config_params JSON DEFAULT NULL COMMENT '资金池配置参数',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_account_type (account_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table account_flow
+CREATE TABLE IF NOT EXISTS account_flow (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    account_id BIGINT UNSIGNED,
+    related_user BIGINT UNSIGNED,
+    account_type VARCHAR(50),
+    change_amount DECIMAL(14,4) NOT NULL,
+    balance_after DECIMAL(14,4),
+    flow_type VARCHAR(50),
+    remark VARCHAR(255),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    -- idx_account_created 的最左前缀已覆盖 account_id 单列查询，
+    -- 账户流水按时间倒序分页可直接走索引
+    INDEX idx_account_created (account_id, created_at),
+    INDEX idx_related_user (related_user),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table points_log
+CREATE TABLE IF NOT EXISTS points_log (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    change_amount DECIMAL(12,4) NOT NULL,
+    balance_after DECIMAL(12,4) NOT NULL,
+    type ENUM('member','merchant','company') NOT NULL,
+    reason VARCHAR(255),
+    related_order BIGINT UNSIGNED,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    -- idx_user_created 的最左前缀已覆盖 user_id 单列查询，
+    -- 用户积分明细按时间排序可直接走索引
+    INDEX idx_user_created (user_id, created_at),
+    INDEX idx_order (related_order)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table user_referrals
+CREATE TABLE IF NOT EXISTS user_referrals (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED UNIQUE NOT NULL,
+    referrer_id BIGINT UNSIGNED,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_referrer (referrer_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table pending_rewards
+CREATE TABLE IF NOT EXISTS pending_rewards (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    reward_type ENUM('referral','team') NOT NULL,
+    amount DECIMAL(12,4) NOT NULL,
+    order_id BIGINT UNSIGNED NOT NULL,
+    layer TINYINT DEFAULT NULL,
+    status ENUM('pending','approved','rejected') DEFAULT 'pending',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_status (user_id, status),
+    INDEX idx_order_id (order_id),
+    INDEX idx_status (status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table coupons
+CREATE TABLE IF NOT EXISTS coupons (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    coupon_type ENUM('user','merchant') NOT NULL,
+    amount DECIMAL(14,4) NOT NULL,
+    status ENUM('unused','used','expired') NOT NULL DEFAULT 'unused',
+    applicable_product_type ENUM('all','normal_only','member_only') NOT NULL DEFAULT 'all' COMMENT '优惠券适
+    用商品范围：all=不限制，normal_only=仅普通商品，member_only=仅会员商品',
+    valid_from DATE NOT NULL,
+    valid_to DATE NOT NULL,
+    used_at DATETIME DEFAULT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_status (user_id, status),
+    INDEX idx_valid_to (valid_to)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table withdrawals
+CREATE TABLE IF NOT EXISTS withdrawals (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    amount DECIMAL(14,4) NOT NULL,
+    tax_amount DECIMAL(14,4) NOT NULL DEFAULT 0.00,
+    actual_amount DECIMAL(14,4) NOT NULL DEFAULT 0.00,
+    status VARCHAR(30) NOT NULL DEFAULT 'pending_auto',
+    audit_remark VARCHAR(255) DEFAULT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    processed_at DATETIME DEFAULT NULL,
+    INDEX idx_user_status (user_id, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table team_rewards
+CREATE TABLE IF NOT EXISTS team_rewards (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    from_user_id BIGINT UNSIGNED NOT NULL,
+    order_id BIGINT UNSIGNED,
+    layer TINYINT NOT NULL,
+    reward_amount DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_id (user_id),
+    INDEX idx_from_user_id (from_user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table weekly_subsidy_records
+CREATE TABLE IF NOT EXISTS weekly_subsidy_records (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    week_start DATE NOT NULL,
+    subsidy_amount DECIMAL(14,4) NOT NULL,
+    points_before DECIMAL(12,4) NOT NULL,
+    points_deducted DECIMAL(12,4) NOT NULL,
+    coupon_id BIGINT UNSIGNED,
+    remark VARCHAR(500) NULL COMMENT '备注，用于标记平台积分池发放',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_week (user_id, week_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table cart
+CREATE TABLE IF NOT EXISTS cart (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    product_id BIGINT UNSIGNED NOT NULL,
+    sku_id BIGINT UNSIGNED NULL,
+    quantity INT DEFAULT 1,
+    specifications JSON DEFAULT NULL,
+    selected TINYINT DEFAULT 1,
+    added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- uk_user_product_sku 的最左前缀已覆盖 user_id 单列查询（含外键所需索引）
+    UNIQUE KEY uk_user_product_sku (user_id, product_id, sku_id),
+    INDEX idx_product_id (product_id),
+    CONSTRAINT cart_ibfk_1 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    CONSTRAINT cart_ibfk_2 FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table refunds
+CREATE TABLE IF NOT EXISTS refunds (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    order_number VARCHAR(50) NOT NULL,
+    refund_type ENUM('return','refund_only') NOT NULL COMMENT 'return=退货退款，refund_only=仅退款',
+    reason TEXT NOT NULL,
+    status ENUM('applied','seller_ok','refund_success','rejected','seller_rejected') DEFAULT 'applied',
+    reject_reason TEXT,
+    merchant_address VARCHAR(255) COMMENT '商家退货地址',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_order_number (order_number),
+    CONSTRAINT refunds_ibfk_1 FOREIGN KEY (order_number) REFERENCES orders(order_number) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table addresses
+CREATE TABLE IF NOT EXISTS addresses (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    name VARCHAR(100) NOT NULL COMMENT '收货人姓名',
+    phone VARCHAR(20) NOT NULL COMMENT '收货人电话',
+    province VARCHAR(20) NOT NULL DEFAULT '' COMMENT '省份',
+    city VARCHAR(20) NOT NULL DEFAULT '' COMMENT '城市',
+    district VARCHAR(20) NOT NULL DEFAULT '' COMMENT '区县',
+    detail TEXT NOT NULL COMMENT '详细地址',
+    is_default TINYINT(1) DEFAULT 0 COMMENT '是否默认地址',
+    addr_type ENUM('shipping','return') NOT NULL DEFAULT 'shipping' COMMENT '地址类型（分为购物地址和退货地址）',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- idx_user_default 的最左前缀已覆盖 user_id 单列查询（含外键所需索引）
+    INDEX idx_user_default (user_id, is_default),
+    CONSTRAINT addresses_ibfk_1 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table merchant_statement
+CREATE TABLE IF NOT EXISTS merchant_statement (
+    merchant_id BIGINT UNSIGNED NOT NULL,
+    date DATE NOT NULL,
+    opening_balance DECIMAL(10,2) NOT NULL,
+    income DECIMAL(10,2) NOT NULL,
+    withdraw DECIMAL(10,2) NOT NULL,
+    closing_balance DECIMAL(10,2) NOT NULL,
+    PRIMARY KEY (merchant_id, date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table alert_order
+CREATE TABLE IF NOT EXISTS alert_order (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    order_number VARCHAR(50) NOT NULL,
+    alert_type VARCHAR(50) NOT NULL,
+    detail TEXT NOT NULL,
+    is_handled TINYINT(1) DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table banner
+CREATE TABLE IF NOT EXISTS banner (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    product_id BIGINT UNSIGNED NOT NULL COMMENT '外键→products.id',
+    image_url VARCHAR(500) NOT NULL COMMENT '图片URL',
+    link_url VARCHAR(500) NULL COMMENT '跳转链接',
+    sort_order INT NULL COMMENT '排序值',
+    status INT NULL DEFAULT 1 COMMENT '状态（0隐藏/1显示）',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    INDEX idx_product_id (product_id),
+    CONSTRAINT banner_ibfk_1 FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table product_attributes
+CREATE TABLE IF NOT EXISTS product_attributes (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    product_id BIGINT UNSIGNED NOT NULL COMMENT '外键→products.id',
+    name VARCHAR(100) NOT NULL COMMENT '属性名',
+    value VARCHAR(100) NOT NULL COMMENT '属性值',
+    INDEX idx_product_id (product_id),
+    CONSTRAINT product_attributes_ibfk_1 FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table product_skus
+CREATE TABLE IF NOT EXISTS product_skus (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    product_id BIGINT UNSIGNED NOT NULL COMMENT '外键→products.id',
+    sku_code VARCHAR(64) NOT NULL UNIQUE COMMENT '唯一SKU编码',
+     price DECIMAL(12,2) NULL COMMENT '商品现价（实际售价）',
+    -- ✅ 新增字段：商品原价（市场价/划线价）
+    original_price DECIMAL(12,2) NULL COMMENT '商品原价',
+    stock INT NULL DEFAULT 0 COMMENT '库存数量',
+    -- ✅ 新增字段：商品规格（存储颜色、尺码等）
+    specifications JSON DEFAULT NULL COMMENT '商品规格（如：{"颜色": "红色", "尺码": "XL"}）',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    INDEX idx_product_id (product_id),
+    CONSTRAINT product_skus_ibfk_1 FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table system_sentence
+CREATE TABLE IF NOT EXISTS system_sentence (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    banner_sentence VARCHAR(128) NULL COMMENT '轮播图标语',
+    system_sentence VARCHAR(128) NULL COMMENT '系统标语',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table user_unilevel
+CREATE TABLE IF NOT EXISTS user_unilevel (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    level TINYINT NOT NULL COMMENT '1-一星联创 2-二星 3-三星',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_uid (user_id),
+    INDEX idx_user_id (user_id),
+    INDEX idx_level (level),
+    CONSTRAINT user_unilevel_ibfk_1 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table directors
+CREATE TABLE IF NOT EXISTS directors (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL UNIQUE COMMENT '用户ID，唯一',
+    status VARCHAR(20) NOT NULL DEFAULT 'active' COMMENT '状态：active=活跃',
+    dividend_amount DECIMAL(14,2) NOT NULL DEFAULT 0.00 COMMENT '累计分红金额',
+    activated_at DATETIME NULL COMMENT '激活时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    INDEX idx_user_id (user_id),
+    INDEX idx_status (status),
+    CONSTRAINT directors_ibfk_1 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table director_dividends
+CREATE TABLE IF NOT EXISTS director_dividends (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL COMMENT '用户ID',
+    period_date DATE NOT NULL COMMENT '分红周期日期',
+    dividend_amount DECIMAL(14,4) NOT NULL COMMENT '分红金额',
+    new_sales DECIMAL(14,4) NOT NULL DEFAULT 0.00 COMMENT '本期新业绩',
+    weight INT NOT NULL DEFAULT 1 COMMENT '权重，基于团队六星人数',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    INDEX idx_user_id (user_id),
+    INDEX idx_period_date (period_date),
+    CONSTRAINT director_dividends_ibfk_1 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table user_bankcards
+CREATE TABLE IF NOT EXISTS user_bankcards (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL,
+    bank_name VARCHAR(50) NOT NULL,
+    bank_account VARCHAR(30) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_card (user_id, bank_account),
+    CONSTRAINT fk_user_bankcard FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table wx_applyment
+CREATE TABLE IF NOT EXISTS wx_applyment (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY COMMENT '主键ID',
+    user_id BIGINT UNSIGNED NOT NULL COMMENT '商家用户ID，关联 users.id',
+    business_code VARCHAR(124) NOT NULL COMMENT '业务申请编号（唯一，服务商自定义）',
+    applyment_id BIGINT UNSIGNED NULL COMMENT '微信支付申请单号',
+    sub_mchid VARCHAR(32) NULL COMMENT '特约商户号',
+    subject_type ENUM(
+        'SUBJECT_TYPE_INDIVIDUAL',
+        'SUBJECT_TYPE_ENTERPRISE',
+        'SUBJECT_TYPE_INSTITUTIONS',
+        'SUBJECT_TYPE_OTHERS'
+    ) NOT NULL COMMENT '主体类型',
+    subject_info JSON NOT NULL COMMENT '主体资料（营业执照、法人信息等）',
+    card_period_begin VARCHAR(32) NULL COMMENT '身份证有效期开始（可存长期）',
+    card_period_end VARCHAR(32) NULL COMMENT '身份证有效期结束（可存长期）',
+    contact_info JSON NOT NULL COMMENT '超级管理员信息',
+    bank_account_info JSON NOT NULL COMMENT '结算账户信息',
+    applyment_state ENUM(
+        'APPLYMENT_STATE_EDITTING',
+        'APPLYMENT_STATE_AUDITING',
+        'APPLYMENT_STATE_REJECTED',
+        'APPLYMENT_STATE_TO_BE_CONFIRMED',
+        'APPLYMENT_STATE_TO_BE_SIGNED',
+        'APPLYMENT_STATE_SIGNING',
+        'APPLYMENT_STATE_FINISHED',
+        'APPLYMENT_STATE_CANCELED'
+    ) NOT NULL DEFAULT 'APPLYMENT_STATE_EDITTING' COMMENT '申请单状态',
+    applyment_state_msg VARCHAR(1024) NULL COMMENT '状态描述',
+    sign_url VARCHAR(512) NULL COMMENT '超管签约链接',
+    audit_detail JSON NULL COMMENT '驳回详情（字段级错误数组）',
+    is_draft TINYINT(1) NOT NULL DEFAULT 1 COMMENT '是否为草稿：1草稿/0已提交',
+    draft_expired_at DATETIME NULL COMMENT '草稿过期时间（创建+7天）',
+    is_core_info_modified TINYINT(1) NOT NULL DEFAULT 0 COMMENT '核心信息修改标记',
+    submitted_at DATETIME NULL COMMENT '正式提交时间',
+    is_timeout_alerted TINYINT(1) NOT NULL DEFAULT 0 COMMENT '审核超时提醒是否已发送',
+    finished_at DATETIME NULL COMMENT '完成时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_business_code (business_code),
+    INDEX idx_user_id (user_id),
+    INDEX idx_applyment_id (applyment_id),
+    INDEX idx_sub_mchid (sub_mchid),
+    INDEX idx_applyment_state (applyment_state),
+    CONSTRAINT fk_wx_applyment_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table wx_applyment_log
+CREATE TABLE IF NOT EXISTS wx_applyment_log (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    applyment_id BIGINT UNSIGNED NOT NULL COMMENT '关联微信申请单号',
+    business_code VARCHAR(124) NOT NULL COMMENT '业务申请编号',
+    old_state VARCHAR(50) NOT NULL COMMENT '变更前状态',
+    new_state VARCHAR(50) NOT NULL COMMENT '变更后状态',
+    state_msg VARCHAR(1024) NULL COMMENT '状态描述',
+    reject_detail JSON NULL COMMENT '驳回详情',
+    operator VARCHAR(50) NULL COMMENT '操作来源：SYSTEM/USER/WECHAT',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_applyment_id (applyment_id),
+    INDEX idx_business_code (business_code),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table wx_applyment_media
+CREATE TABLE IF NOT EXISTS wx_applyment_media (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    applyment_id BIGINT UNSIGNED NULL COMMENT '关联申请单ID，草稿时可为空',
+    user_id BIGINT UNSIGNED NOT NULL COMMENT '上传用户ID，关联 users.id',
+    media_id VARCHAR(512) NULL COMMENT '微信媒体ID（24小时有效）',
+    media_type ENUM(
+        'id_card_front',
+        'id_card_back',
+        'business_license',
+        'bank_card',
+        'authorization_letter',
+        'store_entrance',
+        'indoor_pic',
+        'other'
+    ) NOT NULL COMMENT '材料类型',
+    file_path VARCHAR(500) NOT NULL COMMENT '本地存储路径',
+    file_name VARCHAR(255) NOT NULL COMMENT '原始文件名',
+    file_size INT NOT NULL COMMENT '文件大小（字节）',
+    sha256 CHAR(64) NOT NULL COMMENT '文件SHA256哈希',
+    mime_type VARCHAR(50) NOT NULL COMMENT 'MIME类型',
+    upload_status ENUM('local','uploaded','expired','rejected')
+        NOT NULL DEFAULT 'local' COMMENT '上传状态',
+    expires_at DATETIME NULL COMMENT 'media_id过期时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_applyment_id (applyment_id),
+    INDEX idx_user_id (user_id),
+    INDEX idx_media_id (media_id),
+    INDEX idx_media_type (media_type),
+    CONSTRAINT fk_media_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table merchant_settlement_accounts
+CREATE TABLE IF NOT EXISTS merchant_settlement_accounts (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL COMMENT '商家用户ID，关联 users.id',
+    sub_mchid VARCHAR(32) NULL COMMENT '特约商户号',
+    account_type ENUM('BANK_ACCOUNT_TYPE_PERSONAL','BANK_ACCOUNT_TYPE_CORPORATE')
+        NOT NULL COMMENT '账户类型',
+    account_bank VARCHAR(128) NOT NULL COMMENT '开户银行',
+    bank_name VARCHAR(128) NULL COMMENT '开户行全称（含支行）',
+    bank_branch_id VARCHAR(128) NULL COMMENT '开户行联行号',
+    bank_address_code VARCHAR(20) NOT NULL COMMENT '开户银行地区码（6位数字码）',
+    account_name_encrypted TEXT NOT NULL COMMENT '开户名称（加密，RSA+Base64）',
+    account_number_encrypted TEXT NOT NULL COMMENT '银行账号（加密，RSA+Base64）',
+    card_hash VARCHAR(64) NULL COMMENT '卡号哈希（用于判重，加盐SHA256）',
+    verify_result ENUM('VERIFY_SUCCESS','VERIFY_FAIL','VERIFYING')
+        NOT NULL DEFAULT 'VERIFYING' COMMENT '验证结果',
+    verify_fail_reason VARCHAR(1024) NULL COMMENT '验证失败原因',
+    modify_application_no VARCHAR(64) DEFAULT NULL COMMENT '改绑申请单号',
+    modify_fail_reason VARCHAR(255) DEFAULT NULL COMMENT '改绑失败原因',
+            -- ✅ 新增字段：改绑临时存储
+    new_account_number_encrypted TEXT NULL COMMENT '改绑-新卡号(加密)',
+    new_account_name_encrypted TEXT NULL COMMENT '改绑-新户名(加密)',
+    new_bank_name VARCHAR(128) NULL COMMENT '改绑-新开户行',
+    old_account_backup JSON NULL COMMENT '改绑-旧卡备份{number,name,bank}',
+    is_default TINYINT(1) NOT NULL DEFAULT 1 COMMENT '是否默认账户：1默认',
+    status TINYINT(1) NOT NULL DEFAULT 1 COMMENT '账户状态：1启用/0禁用',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    bind_at DATETIME NULL COMMENT '绑定成功时间',
+    INDEX idx_sub_mchid (sub_mchid),
+    INDEX idx_verify_result (verify_result),
+    INDEX idx_status (status),
+    INDEX idx_card_hash (card_hash),
+    -- idx_user_status 的最左前缀已覆盖 user_id 单列查询（含外键所需索引）
+    INDEX idx_user_status (user_id, status),
+    CONSTRAINT fk_merchant_account_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table merchant_realname_verification
+CREATE TABLE IF NOT EXISTS merchant_realname_verification (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL UNIQUE COMMENT '商家用户ID，一个用户一条记录',
+    verification_type ENUM('individual','enterprise') NOT NULL COMMENT '认证类型',
+    status ENUM('pending','auditing','approved','rejected')
+        NOT NULL DEFAULT 'pending' COMMENT '认证状态',
+    audit_remark TEXT NULL COMMENT '审核备注/驳回原因',
+    real_name VARCHAR(100) NOT NULL COMMENT '姓名/企业名称',
+    id_card_no_encrypted TEXT NULL COMMENT '身份证号/统一社会信用代码（加密）',
+    id_card_front_media_id VARCHAR(512) NULL COMMENT '身份证正面media_id',
+    id_card_back_media_id VARCHAR(512) NULL COMMENT '身份证反面media_id',
+    business_license_no VARCHAR(100) NULL COMMENT '营业执照号（企业必填）',
+    business_license_media_id VARCHAR(512) NULL COMMENT '营业执照media_id',
+    legal_person_name VARCHAR(100) NULL COMMENT '法人姓名（企业必填）',
+    legal_person_id_no_encrypted TEXT NULL COMMENT '法人身份证号(加密)',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    audited_at DATETIME NULL COMMENT '审核时间',
+    INDEX idx_status (status),
+    CONSTRAINT fk_realname_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table user_bankcard_operations
+CREATE TABLE IF NOT EXISTS user_bankcard_operations (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT UNSIGNED NOT NULL COMMENT '用户ID',
+    operation_type VARCHAR(50) NOT NULL COMMENT '操作类型：bind/unbind/set_default/verify',
+    target_id BIGINT UNSIGNED NULL COMMENT '关联的结算账户ID(merchant_settlement_accounts.id)',
+    old_val JSON NULL COMMENT '旧值（JSON）',
+    new_val JSON NULL COMMENT '新值（JSON）',
+    remark TEXT NULL COMMENT '操作详情',
+    admin_key VARCHAR(100) NULL COMMENT '管理员标识(SYSTEM表示系统操作)',
+    ip_address VARCHAR(45) NULL COMMENT 'IP地址',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_id (user_id),
+    INDEX idx_operation_type (operation_type),
+    INDEX idx_created_at (created_at),
+    CONSTRAINT fk_bankcard_op_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    CONSTRAINT fk_bankcard_op_target FOREIGN KEY (target_id) REFERENCES merchant_settlement_accounts(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table merchant_stores
+CREATE TABLE IF NOT EXISTS merchant_stores (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY COMMENT '店铺ID',
+    user_id BIGINT UNSIGNED NOT NULL UNIQUE COMMENT '商家用户ID（唯一）',
+    store_name VARCHAR(100) NOT NULL COMMENT '店铺名称',
+    store_logo_image_id VARCHAR(100) COMMENT '店铺LOGO图片ID',
+    store_description VARCHAR(500) COMMENT '店铺简介',
+    contact_name VARCHAR(20) NOT NULL COMMENT '联系人姓名',
+    contact_phone VARCHAR(11) NOT NULL COMMENT '联系人手机号',
+    contact_email VARCHAR(100) COMMENT '联系人邮箱',
+    business_hours VARCHAR(100) COMMENT '营业时间',
+    store_address VARCHAR(200) COMMENT '店铺地址',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    INDEX idx_user_id (user_id),
+    INDEX idx_store_name (store_name),
+    CONSTRAINT fk_merchant_stores_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table merchant_withdraw_records
+CREATE TABLE IF NOT EXISTS merchant_withdraw_records (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    out_request_no VARCHAR(32) UNIQUE NOT NULL COMMENT '商户提现单号',
+    withdraw_id VARCHAR(64) COMMENT '微信提现单号',
+    amount INT NOT NULL COMMENT '提现金额（单位：分）',
+    account_type VARCHAR(20) NOT NULL DEFAULT 'BASIC' COMMENT '出款账户类型：BASIC/OPERATION/FEES',
+    bank_memo VARCHAR(32) COMMENT '银行附言',
+    remark VARCHAR(56) COMMENT '提现备注',
+    status VARCHAR(20) NOT NULL DEFAULT 'INIT' COMMENT '状态：INIT/SUCCESS/FAIL/PROCESSING',
+    fail_reason VARCHAR(255) COMMENT '失败原因',
+    notify_url VARCHAR(256) COMMENT '通知地址',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_out_request_no (out_request_no),
+    INDEX idx_withdraw_id (withdraw_id),
+    INDEX idx_status (status),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- @table store_logos
+CREATE TABLE IF NOT EXISTS store_logos (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY COMMENT 'LOGO ID',
+    image_id VARCHAR(100) NOT NULL UNIQUE COMMENT '图片ID（唯一）',
+    user_id BIGINT UNSIGNED NOT NULL COMMENT '商家用户ID',
+    file_path VARCHAR(500) NOT NULL COMMENT '文件存储路径',
+    file_size INT NOT NULL COMMENT '文件大小（字节）',
+    upload_time DATETIME NOT NULL COMMENT '上传时间',
+    INDEX idx_user_id (user_id),
+    INDEX idx_image_id (image_id),
+    CONSTRAINT fk_store_logos_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -10,7 +10,7 @@ from fastapi.openapi.docs import get_swagger_ui_html, get_swagger_ui_oauth2_redi
 from core.json_response import DecimalJSONResponse, register_exception_handlers
 from fastapi.staticfiles import StaticFiles
 from core.middleware import setup_cors, setup_static_files
-from core.config import get_db_config, PIC_PATH, AVATAR_UPLOAD_DIR,UVICORN_PORT
+from core.config import get_db_config, PIC_PATH, AVATAR_UPLOAD_DIR, UVICORN_PORT, UVICORN_WORKERS, settings
 from core.logging import setup_logging
 from database_setup import initialize_database
 from api.wechat_pay.routes import register_wechat_pay_routes
@@ -82,6 +82,17 @@ def on_startup():
     except Exception as e:
         logger.error(f"初始化数据库失败: {e}")
 
+    # 一条 information_schema 查询预热全部表结构缓存，替代冷启动期的逐表 SHOW COLUMNS
+    try:
+        from core.database import get_conn, get_db_config_cached
+        from core.table_access import warm_table_cache
+        with get_conn(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                count = warm_table_cache(cur, get_db_config_cached()['database'])
+        logger.info(f"表结构缓存预热完成，共 {count} 张表")
+    except Exception as e:
+        logger.warning(f"表结构缓存预热失败: {e}")
+
     # 启动时刷新快递公司列表缓存
     try:
         from api.order.wechat_shipping import WechatShippingManager
@@ -90,6 +101,22 @@ def on_startup():
     except Exception as e:
         logger.warning(f"刷新快递公司列表缓存失败: {e}")
 
+    # 启动时预生成 OpenAPI Schema，避免首个 /openapi.json 请求的冷启动延迟
+    try:
+        custom_openapi()
+    except Exception as e:
+        logger.warning(f"预生成 OpenAPI Schema 失败: {e}")
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    # 应用退出时释放数据库连接池里的空闲连接
+    try:
+        from core.database import close_pool
+        close_pool()
+    except Exception as e:
+        logger.warning(f"关闭数据库连接池失败: {e}")
+
 # ... 原有代码保持不变 ...
 
 tags_metadata = [
@@ -145,6 +172,10 @@ app.openapi_tags = tags_metadata
 # 按优先级先挂载 avatars（用户头像），再挂载 /pic 到商品图片目录
 app.mount("/pic/avatars", StaticFiles(directory=str(AVATAR_UPLOAD_DIR)), name="avatars")
 app.mount("/pic", StaticFiles(directory=str(PIC_PATH)), name="pic")
+# 请求级数据库连接作用域：同一请求内的 execute_* 辅助函数共享一个连接/事务
+from core.database import db_scope
+app.middleware("http")(db_scope)
+
 # 添加 CORS 中间件和静态文件（统一配置）pic_path
 setup_cors(app)
 setup_static_files(app)
@@ -163,6 +194,23 @@ register_offline_routes(app)
 
 # 自定义 OpenAPI Schema 生成函数，确保只显示定义的4个标签
 # 注意：必须在路由注册之后设置，否则 schema 中不会包含路由
+# 标签归并：未定义标签按包含的关键字折叠到主标签，避免逐个 elif 字符串扫描
+_DEFINED_TAG_NAMES = {tag["name"] for tag in tags_metadata}
+_TAG_KEYWORD_ALIASES = (
+    ("订单系统", "订单系统"),
+    ("商品", "商品管理"),
+)
+
+
+def _map_operation_tag(tag: str):
+    if tag in _DEFINED_TAG_NAMES:
+        return tag
+    for keyword, target in _TAG_KEYWORD_ALIASES:
+        if keyword in tag:
+            return target
+    return None
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -175,23 +223,14 @@ def custom_openapi():
         tags=tags_metadata,
     )
     # 过滤掉未定义的标签，只保留 tags_metadata 中定义的标签
-    defined_tag_names = {tag["name"] for tag in tags_metadata}
     if "tags" in openapi_schema:
-        openapi_schema["tags"] = [tag for tag in openapi_schema["tags"] if tag["name"] in defined_tag_names]
+        openapi_schema["tags"] = [tag for tag in openapi_schema["tags"] if tag["name"] in _DEFINED_TAG_NAMES]
     # 确保所有路径的 tags 都在定义的标签列表中
     if "paths" in openapi_schema:
         for path_item in openapi_schema["paths"].values():
             for operation in path_item.values():
                 if "tags" in operation and operation["tags"]:
-                    # 如果路由使用了未定义的标签，根据内容替换为合适的标签
-                    filtered_tags = []
-                    for tag in operation["tags"]:
-                        if tag in defined_tag_names:
-                            filtered_tags.append(tag)
-                        elif "订单系统" in tag:
-                            filtered_tags.append("订单系统")
-                        elif "商品" in tag or "商品管理" in tag or "商品扩展" in tag:
-                            filtered_tags.append("商品管理")
+                    filtered_tags = [t for t in map(_map_operation_tag, operation["tags"]) if t]
                     operation["tags"] = filtered_tags if filtered_tags else ["商品管理"]
     app.openapi_schema = openapi_schema
     return app.openapi_schema
@@ -237,12 +276,15 @@ if __name__ == "__main__":
     print(f"订单系统 API 文档: http://127.0.0.1:{post}/docs")
     print(f"商品管理系统 API 文档: http://127.0.0.1:{post}/docs")
 
-    # 使用导入字符串以支持热重载
+    # 开发环境单进程 + 热重载；生产环境关闭 reload、开多 worker
+    # （uvicorn 的 reload 与 workers 互斥，reload 监控文件会持续消耗 CPU）
+    dev_mode = settings.ENVIRONMENT == "development"
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=post,
-        reload=False,  # 热重载已启用
+        reload=dev_mode,
+        workers=None if dev_mode else UVICORN_WORKERS,
         log_level="info",
         access_log=True
     )
\ No newline at end of file
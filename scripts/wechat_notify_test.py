@@ -8,11 +8,12 @@
 """
 import os
 import sys
-import json
+import orjson
 import time
 import base64
+import asyncio
 import argparse
-import requests
+import httpx
 import secrets
 from pathlib import Path
 from cryptography.hazmat.primitives import hashes, serialization
@@ -23,89 +24,137 @@ DEFAULT_URL = os.getenv('WX_NOTIFY_URL', 'https://hzai.tech/wechat-pay/notify')
 DEFAULT_KEY_PATH = os.getenv('WECHAT_MERCHANT_KEY_PATH', '/var/www/DS/certs/apiclient_key.pem')
 
 
+# 签名参数无状态，模块级单例避免每次签名都新建两个对象
+_PKCS1V15 = padding.PKCS1v15()
+_SHA256 = hashes.SHA256()
+
+
 def load_private_key(path: str):
     with open(path, 'rb') as f:
         return serialization.load_pem_private_key(f.read(), password=None)
 
 
 def sign_callback(private_key, timestamp: str, nonce: str, body: str) -> str:
-    message = f"{timestamp}\n{nonce}\n{body}\n"
+    # 直接拼字节：不用先构造大 str 再整体 encode，body 只编码一次
+    message = b''.join((
+        timestamp.encode('ascii'), b'\n',
+        nonce.encode('ascii'), b'\n',
+        body.encode('utf-8'), b'\n',
+    ))
     signature = private_key.sign(
-        message.encode('utf-8'),
-        padding.PKCS1v15(),
-        hashes.SHA256()
+        message,
+        _PKCS1V15,
+        _SHA256
     )
-    return base64.b64encode(signature).decode('utf-8')
+    # base64 输出只含 ASCII，按 ascii 解码跳过 UTF-8 校验
+    return base64.b64encode(signature).decode('ascii')
+
+
+# XML 包装的固定前后缀（与 routes.py 的解析方式对应）
+_XML_PREFIX = '<?xml version="1.0" encoding="utf-8"?><xml><resource>'
+_XML_SUFFIX = '</resource></xml>'
 
 
 def build_body(event_type='TRANSACTION.SUCCESS', out_trade_no='TEST123', tx_id='WX123', amount=100, as_json=True):
+    # orjson 直接产出 UTF-8 字节（天然 ensure_ascii=False），这里解码回 str
+    # 以保持原有返回类型
     if as_json:
-        return json.dumps({
+        return orjson.dumps({
             "resource": {
                 "event_type": event_type,
                 "out_trade_no": out_trade_no,
                 "transaction_id": tx_id,
                 "amount": {"total": amount}
             }
-        }, ensure_ascii=False)
+        }).decode('utf-8')
     else:
         # xml wrapper where <resource> contains JSON string (matches routes.py handling)
-        resource = json.dumps({
+        resource = orjson.dumps({
             "event_type": event_type,
             "out_trade_no": out_trade_no,
             "transaction_id": tx_id,
             "amount": {"total": amount}
-        }, ensure_ascii=False)
-        return '<?xml version="1.0" encoding="utf-8"?><xml><resource>' + resource + '</resource></xml>'
+        }).decode('utf-8')
+        # join 一次分配出整串，省掉两次 + 拼接的中间字符串
+        return ''.join((_XML_PREFIX, resource, _XML_SUFFIX))
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--url', default=DEFAULT_URL)
-    parser.add_argument('--key', default=DEFAULT_KEY_PATH)
-    parser.add_argument('--xml', action='store_true', help='Use XML wrapper')
-    parser.add_argument('--bypass', action='store_true', help='Add X-Bypass-Signature header to skip verification on server (dev only)')
-    parser.add_argument('--out_trade_no', default='TEST123')
-    parser.add_argument('--amount', type=int, default=100)
-    args = parser.parse_args()
-
-    url = args.url
-    key_path = args.key
-
-    if not Path(key_path).exists():
-        print(f"私钥文件不存在: {key_path}")
-        sys.exit(2)
-
-    private_key = load_private_key(key_path)
-
+async def _send_one(client, args, private_key, seq: int):
+    """签名并发送一条通知，返回下游状态码（异常向上抛给 gather）"""
     as_json = not args.xml
-    body = build_body(out_trade_no=args.out_trade_no, amount=args.amount, as_json=as_json)
+    # 压测时给单号加序号后缀，避免服务端按单号去重吞掉后续通知
+    out_trade_no = args.out_trade_no if args.count == 1 else f"{args.out_trade_no}_{seq}"
+    body = build_body(out_trade_no=out_trade_no, amount=args.amount, as_json=as_json)
     timestamp = str(int(time.time()))
     nonce = secrets.token_hex(16)
 
-    signature = sign_callback(private_key, timestamp, nonce, body)
-
     headers = {
         'Content-Type': 'application/json' if as_json else 'application/xml',
-        'Wechatpay-Signature': signature,
+        'Wechatpay-Signature': sign_callback(private_key, timestamp, nonce, body),
         'Wechatpay-Timestamp': timestamp,
         'Wechatpay-Nonce': nonce,
         'Wechatpay-Serial': 'TEST_SERIAL'
     }
-
     if args.bypass:
         headers['X-Bypass-Signature'] = 'true'
 
-    print('发送到:', url)
-    print('Headers:', {k: headers[k] for k in headers if k != 'Wechatpay-Signature'})
-    print('Body:', body[:200])
-
-    try:
-        r = requests.post(url, data=body.encode('utf-8'), headers=headers, timeout=15)
+    r = await client.post(args.url, content=body.encode('utf-8'), headers=headers)
+    if args.count == 1:
+        print('Headers:', {k: headers[k] for k in headers if k != 'Wechatpay-Signature'})
+        print('Body:', body[:200])
         print('响应状态:', r.status_code)
         print('响应体:', r.text)
-    except Exception as e:
-        print('请求失败:', e)
+    return r.status_code
+
+
+async def run_batch(args, private_key):
+    """并发发送 args.count 条通知：一个连接池复用 TCP/TLS，信号量限流"""
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(seq):
+        async with sem:
+            return await _send_one(client, args, private_key, seq)
+
+    async with httpx.AsyncClient(timeout=15) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(one(seq) for seq in range(args.count)),
+            return_exceptions=True
+        )
+        elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if isinstance(r, int) and r < 400)
+    failed = args.count - ok
+    if args.count > 1:
+        print(f"完成 {args.count} 条通知：成功 {ok}，失败 {failed}，"
+              f"耗时 {elapsed:.2f}s（{args.count / elapsed:.1f} 条/秒）")
+    for r in results:
+        if isinstance(r, Exception):
+            print('请求失败:', r)
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--key', default=DEFAULT_KEY_PATH)
+    parser.add_argument('--xml', action='store_true', help='Use XML wrapper')
+    parser.add_argument('--bypass', action='store_true', help='Add X-Bypass-Signature header to skip verification on server (dev only)')
+    parser.add_argument('--out_trade_no', default='TEST123')
+    parser.add_argument('--amount', type=int, default=100)
+    parser.add_argument('--count', type=int, default=1, help='发送的通知总数（压测用）')
+    parser.add_argument('--concurrency', type=int, default=1, help='并发在途请求数上限')
+    args = parser.parse_args()
+
+    if not Path(args.key).exists():
+        print(f"私钥文件不存在: {args.key}")
+        sys.exit(2)
+
+    # 私钥只加载解析一次，循环内复用
+    private_key = load_private_key(args.key)
+
+    print('发送到:', args.url)
+    asyncio.run(run_batch(args, private_key))
 
 
 if __name__ == '__main__':